@@ -1,108 +1,431 @@
 # api.py
 import datetime
 import json
-import firebase_admin
-from firebase_admin import credentials, firestore, db as realtime_db
-from firebase_admin import auth
+import logging
+import threading
 from google.oauth2 import service_account
 import streamlit as st
 from functools import lru_cache
-from datetime import datetime
-
-# Initialize Firebase with proper error handling
-
-
-def initialize_firebase():
-    if not firebase_admin._apps:
-        try:
-            # Get configuration from Streamlit secrets
-            key_dict = json.loads(st.secrets["KEY"])
-            database_url = st.secrets.get("LINK")
-
-            if not database_url:
-                raise ValueError("Database URL is missing in secrets")
-
-            cred = credentials.Certificate(key_dict)
-            firebase_admin.initialize_app(cred, {
-                'databaseURL': database_url
-            })
-            return True
-        except json.JSONDecodeError:
-            st.error("Invalid service account JSON in secrets")
-            raise
-        except ValueError as e:
-            st.error(f"Firebase configuration error: {e}")
-            raise
-        except Exception as e:
-            st.error(f"Failed to initialize Firebase: {e}")
-            raise
-    return True
-
-
-# Initialize Firebase
-if initialize_firebase():
-    db = firestore.client()
-    realtime_db = firebase_admin.db
-    auth = firebase_admin.auth
-else:
-    st.error("Firebase initialization failed. Check your configuration.")
-    st.stop()
-
-
-@st.cache_data(ttl=300)
+from datetime import datetime, timedelta
+from firebase_config import get_firestore, get_realtime_db
+from record_schema import FIELDS_BY_NAME, ProcurementRecord, records_from_firebase
+from record_diff import diff_records, log_changes, update_paths
+from record_store import RecordStore
+from ttl_cache import TTLCache
+from user_profiles import get_user_profile
+from audit_log import AuditLogWriter
+from customer_catalog import add_customer_name, customer_name_path, get_customer_catalog
+from name_index import NameIndex
+import bulk_import
+import log_index
+
+logger = logging.getLogger(__name__)
+
+
+RECORD_PATHS = {
+    "New Reference": "/forms",
+    "After Sales": "/aftersales",
+}
+
+
+def _record_path(form_type):
+    if form_type not in RECORD_PATHS:
+        raise ValueError(
+            "Invalid form type. Must be 'New Reference' or 'After Sales'.")
+    return RECORD_PATHS[form_type]
+
+
+@st.cache_resource
+def _record_store(form_type):
+    """Process-wide record store, shared by every session."""
+    return RecordStore(_record_path(form_type), convert=ProcurementRecord.from_firebase,
+                       convert_many=records_from_firebase)
+
+
 def get_records(form_type="New Reference"):
     try:
-        if form_type == "New Reference":
-            ref = realtime_db.reference('/forms')
-        elif form_type == "After Sales":
-            ref = realtime_db.reference('/aftersales')
-        else:
-            raise ValueError(
-                "Invalid form type. Must be 'New Reference' or 'After Sales'.")
-        records = ref.get() or {}
-        return {k: convert_dates_in_record(v) for k, v in records.items()}
+        store = _record_store(form_type)
+        store.sync(get_realtime_db().reference(store.path))
+        return {ref: record.to_dict() for ref, record in store.snapshot().items()}
     except Exception as e:
         st.error(f"Error getting records: {e}")
         return {}
 
 
-def save_record(reference_number, data, form_type,type):
+def get_record_rows(form_type="New Reference"):
+    """Flat table rows for every record, newest reference first."""
+    try:
+        store = _record_store(form_type)
+        store.sync(get_realtime_db().reference(store.path))
+        records = store.snapshot()
+        return [records[ref].flat_row() for ref in sorted(records, reverse=True)]
+    except Exception as e:
+        st.error(f"Error getting records: {e}")
+        return []
+
+
+def get_records_version(form_type="New Reference"):
+    """Sync the record store and return a number that changes whenever any record does."""
+    try:
+        store = _record_store(form_type)
+        store.sync(get_realtime_db().reference(store.path))
+        return store.version
+    except Exception as e:
+        st.error(f"Error getting records: {e}")
+        return None
+
+
+# Typeahead kind -> (record section, field) whose distinct values feed its NameIndex
+NAME_FIELDS = {
+    "customer": ("customerForm", "name"),
+    "supplier": ("vendorForm", "supplierName"),
+}
+
+
+@st.cache_resource
+def _name_index(kind):
+    """Process-wide name index, seeded with the customer workbook for customers."""
+    return NameIndex(get_customer_catalog().names() if kind == "customer" else ())
+
+
+# Form types whose record names are being folded into the name indexes in the background
+_name_loads = set()
+_name_loads_lock = threading.Lock()
+
+
+def get_name_index(kind, form_type="New Reference", wait=True):
+    """NameIndex for "customer" or "supplier", topped up with names from form_type's changed records.
+
+    Only form_type's store is synced, so the other store is not loaded until it
+    is used. With ``wait=False`` the index is returned as it stands and the store
+    is synced by a background thread, so a page render never waits on a full
+    record download; later renders see the names it adds.
+    """
+    index = _name_index(kind)
+    try:
+        store = _record_store(form_type)
+        reference = get_realtime_db().reference(store.path)
+        indexes = {name: _name_index(name) for name in NAME_FIELDS}
+        if wait:
+            _fold_record_names(indexes, store, reference, form_type)
+        else:
+            with _name_loads_lock:
+                if form_type in _name_loads:
+                    return index
+                _name_loads.add(form_type)
+            threading.Thread(target=_fold_record_names_in_background, name="name-index-loader",
+                             args=(indexes, store, reference, form_type), daemon=True).start()
+    except Exception as e:
+        st.error(f"Error loading name suggestions: {e}")
+    return index
+
+
+def _fold_record_names(indexes, store, reference, form_type):
+    store.sync(reference)
+    version = store.version
+    for kind, index in indexes.items():
+        if index.source_versions.get(form_type) != version:
+            section, field = NAME_FIELDS[kind]
+            index.update(getattr(record.section(section), field)
+                         for record in store.snapshot().values())
+            index.source_versions[form_type] = version
+
+
+def _fold_record_names_in_background(indexes, store, reference, form_type):
+    try:
+        _fold_record_names(indexes, store, reference, form_type)
+    except Exception:
+        logger.exception("Loading %s names for the name index failed", form_type)
+    finally:
+        with _name_loads_lock:
+            _name_loads.discard(form_type)
+
+
+def _index_record_names(data, form_type, in_sync):
+    """Add a saved record's names to any name index already built in this process."""
+    version = _record_store(form_type).version
+    for kind, (section, field) in NAME_FIELDS.items():
+        index = _name_index(kind)
+        index.add((data.get(section) or {}).get(field))
+        if in_sync.get(kind):
+            index.source_versions[form_type] = version
+
+
+def _new_customer_names(names, form_type):
+    """The distinct names among ``names`` that neither the catalog nor any of form_type's records use yet.
+
+    Call it before writing the records, whose names would otherwise count as known.
+    """
+    index = get_name_index("customer", form_type)
+    return sorted(name for name in {(name or "").strip() for name in names} - {""}
+                  if name not in index)
+
+
+@st.cache_resource
+def _record_cache():
+    """Per-reference cache for single-record reads (see get_record)."""
+    return TTLCache(maxsize=256, ttl=120)
+
+
+def get_record(reference_number, form_type="New Reference"):
+    """Read one record from /forms/{ref} or /aftersales/{ref}, or None if it does not exist."""
+    try:
+        if not reference_number or any(c in reference_number for c in '$#[]/.'):
+            return None
+        cache = _record_cache()
+        key = (form_type, reference_number)
+        record = cache.get(key)
+        if record is None:
+            record = get_realtime_db().reference(
+                f'{_record_path(form_type)}/{reference_number}').get()
+            if record is None:
+                return None
+            record = ProcurementRecord.from_firebase(reference_number, record).to_dict()
+            cache.set(key, record)
+        return record
+    except Exception as e:
+        st.error(f"Error getting record: {e}")
+        return None
+
+
+class RecordExistsError(Exception):
+    """Raised when creating a record whose reference number is already taken."""
+
+
+def save_record(reference_number, data, form_type, type, original=None):
+    """Create or edit a record.
+
+    Create is a single transaction that fails if the reference already exists;
+    edit writes only the fields that differ from ``original`` (the record the
+    form was loaded from, read again if not given).
+    """
     try:
-        get_records.clear()
         if not reference_number or any(c in reference_number for c in '$#[]/.'):
             raise ValueError("Invalid reference number for Firebase path.")
 
         # Determine the node based on form_type
-        if form_type == "New Reference":
-            node_path = f'/forms/{reference_number}'
-        elif form_type == "After Sales":
-            node_path = f'/aftersales/{reference_number}'
+        node_path = f'{_record_path(form_type)}/{reference_number}'
+
+        node_ref = get_realtime_db().reference(node_path)
+        new_customers = _new_customer_names([(data.get("customerForm") or {}).get("name")], form_type)
+        # Server-side stamp drives the incremental sync in RecordStore
+        stamp = {".sv": "timestamp"}
+        details = data
+        if type.lower() == "create":
+            def create(current):
+                if current is not None:
+                    raise RecordExistsError(reference_number)
+                return dict(data, lastModified=stamp)
+            node_ref.transaction(create)
         else:
-            raise ValueError(
-                "Invalid form type. Must be 'New Reference' or 'After Sales'.")
-
-        node_ref = realtime_db.reference(node_path)
-        if type.lower() == "create" and node_ref.get() is not None:
-            return st.error("A record with this reference number already exists.")
-        else:
-            node_ref.set(data)
-        log_user_action(f"{type.upper()} Records", data, reference_number)
+            if original is None:
+                original = get_record(reference_number, form_type)
+            if original is None:
+                node_ref.set(dict(data, lastModified=stamp))
+            else:
+                changes = diff_records(reference_number, original, data)
+                if not changes:
+                    st.info("No changes to save.")
+                    return True
+                node_ref.update(dict(update_paths(changes), lastModified=stamp))
+                # Edits are logged as a {field: [old, new]} changeset, not a record copy
+                details = log_changes(changes)
+        store = _record_store(form_type)
+        # Indexes that had seen every earlier version only need this record's names
+        in_sync = {kind: _name_index(kind).source_versions.get(form_type) == store.version
+                   for kind in NAME_FIELDS}
+        store.put(reference_number, data)
+        for name in new_customers:
+            add_customer_name(name)
+        _index_record_names(data, form_type, in_sync)
+        _record_cache().invalidate((form_type, reference_number))
+        log_user_action(f"{type.upper()} Records", details, reference_number,
+                        pic=(data.get("customerForm") or {}).get("pic"))
         st.success("All forms submitted successfully!")
         st.balloons()
 
         return True
+    except RecordExistsError:
+        st.error("A record with this reference number already exists.")
+        return False
     except Exception as e:
         st.error(f"Error saving record: Save the current form befor saving all form.")
         return False
 
 
+IMPORTS_NODE = 'imports'
+
+
+def get_import_checkpoint(job_id):
+    """Progress saved for an import under /imports/{job_id}, or None."""
+    try:
+        return get_realtime_db().reference(f'/{IMPORTS_NODE}/{job_id}').get()
+    except Exception as e:
+        st.error(f"Error getting import progress: {e}")
+        return None
+
+
+def import_records(content, filename, form_type, batch_size=500, progress=None, restart=False):
+    """Bulk-create records from an XLSX/CSV upload.
+
+    Rows are validated against the form schema and written in chunked
+    multi-path updates. Each chunk also moves the /imports/{id} checkpoint and
+    adds one summarized audit log entry. Existing references are skipped, and
+    an interrupted import of the same file resumes after the last written
+    chunk. ``progress(rows_done)`` is called after each chunk. Like save_record,
+    each chunk's names go into the customer catalog and name indexes.
+    """
+    try:
+        rtdb = get_realtime_db()
+        path = _record_path(form_type).strip('/')
+        job_id = bulk_import.import_id(content, form_type)
+        checkpoint = {} if restart else (get_import_checkpoint(job_id) or {})
+        summary = {
+            "id": job_id,
+            "rowsDone": checkpoint.get("rowsDone", 0),
+            "imported": checkpoint.get("imported", 0),
+            "skipped": checkpoint.get("skipped", 0),
+            "errorCount": checkpoint.get("errorCount", 0),
+            "errors": [],
+            "unknownColumns": [],
+        }
+        if checkpoint.get("status") == "done":
+            return summary
+
+        store = _record_store(form_type)
+        store.sync(rtdb.reference(store.path))
+        existing = set(store.snapshot())
+        rows = bulk_import.read_rows(content, filename)
+        columns, summary["unknownColumns"] = bulk_import.map_headers(next(rows, ()))
+        stamp = {".sv": "timestamp"}
+        batch = {}
+
+        def write_batch(status):
+            updates = {f'{path}/{ref}': dict(record, lastModified=stamp)
+                       for ref, record in batch.items()}
+            new_customers = _new_customer_names((record["customerForm"].get("name")
+                                                 for record in batch.values()), form_type)
+            for name in new_customers:
+                updates[customer_name_path(name)] = name
+            updates[f'{IMPORTS_NODE}/{job_id}'] = {
+                "file": filename,
+                "formType": form_type,
+                "status": status,
+                "updatedAt": stamp,
+                **{key: summary[key] for key in ("rowsDone", "imported", "skipped", "errorCount")},
+            }
+            # Records, new customer names and checkpoint land in the same atomic update
+            rtdb.reference('/').update(updates)
+            for name in new_customers:
+                get_customer_catalog().add(name)
+            if batch:
+                in_sync = {kind: _name_index(kind).source_versions.get(form_type) == store.version
+                           for kind in NAME_FIELDS}
+                for ref, record in batch.items():
+                    store.put(ref, record)
+                for record in batch.values():
+                    _index_record_names(record, form_type, in_sync)
+                refs = sorted(batch)
+                log_user_action("IMPORT Records", {
+                    "file": filename, "count": len(refs), "first": refs[0], "last": refs[-1],
+                }, refs[0])
+                batch.clear()
+            if progress:
+                progress(summary["rowsDone"])
+
+        for row_number, values in enumerate(rows, start=1):
+            if row_number <= summary["rowsDone"]:
+                continue
+            if not bulk_import.is_blank(values):
+                reference_number, record, errors = bulk_import.row_to_record(values, columns)
+                if errors:
+                    summary["errorCount"] += 1
+                    # +1 for the header line, so it matches the spreadsheet row
+                    summary["errors"].append((row_number + 1, reference_number, "; ".join(errors)))
+                elif reference_number in existing:
+                    summary["skipped"] += 1
+                else:
+                    existing.add(reference_number)
+                    batch[reference_number] = record
+                    summary["imported"] += 1
+            summary["rowsDone"] = row_number
+            if len(batch) >= batch_size:
+                write_batch("running")
+        write_batch("done")
+        _record_cache().clear()
+        return summary
+    except Exception as e:
+        st.error(f"Error importing records: {e}")
+        return None
+
+
+def bulk_update_field(reference_numbers, field, value, form_type="New Reference"):
+    """Set one field on many records with a single multi-path update.
+
+    References that do not exist or already hold ``value`` are left alone.
+    Each changed record gets its own {field: [old, new]} audit entry; the
+    background log writer commits them together. Returns
+    {"updated": count, "unchanged": count, "missing": [refs]}, or None on failure.
+    """
+    try:
+        spec = FIELDS_BY_NAME.get(field)
+        if spec is None:
+            raise ValueError(f"Unknown field: {field}")
+        if spec.is_date:
+            value = str(value)
+        path = _record_path(form_type).strip('/')
+        rtdb = get_realtime_db()
+        store = _record_store(form_type)
+        store.sync(rtdb.reference(store.path))
+
+        stamp = {".sv": "timestamp"}
+        updates, changed, missing, unchanged = {}, {}, [], 0
+        for ref in dict.fromkeys(reference_numbers):
+            record = store.get(ref)
+            if record is None:
+                missing.append(ref)
+                continue
+            data = record.to_firebase()
+            old = data[spec.section].get(field)
+            if old == value:
+                unchanged += 1
+                continue
+            data[spec.section][field] = value
+            changed[ref] = (data, old)
+            updates[f'{path}/{ref}/{spec.section}/{field}'] = value
+            updates[f'{path}/{ref}/lastModified'] = stamp
+        result = {"updated": len(changed), "unchanged": unchanged, "missing": missing}
+        if not changed:
+            return result
+
+        # A new customer name is saved to /customers in the same update
+        new_customers = []
+        if (spec.section, field) == NAME_FIELDS["customer"]:
+            new_customers = _new_customer_names([value], form_type)
+        for name in new_customers:
+            updates[customer_name_path(name)] = name
+        rtdb.reference('/').update(updates)
+        for name in new_customers:
+            get_customer_catalog().add(name)
+        in_sync = {kind: _name_index(kind).source_versions.get(form_type) == store.version
+                   for kind in NAME_FIELDS}
+        for ref, (data, old) in changed.items():
+            store.put(ref, data)
+            _record_cache().invalidate((form_type, ref))
+            log_user_action("BULK UPDATE Records", log_changes({field: [old, value]}), ref,
+                            pic=data["customerForm"].get("pic"))
+        for data, _ in changed.values():
+            _index_record_names(data, form_type, in_sync)
+        return result
+    except Exception as e:
+        st.error(f"Error updating records: {e}")
+        return None
+
+
 def get_latest_reference_number():
     try:
-        records = get_records()
-        if not records:
-            return None
-        latest_ref = max(records.keys())
-        return latest_ref
+        store = _record_store("New Reference")
+        return store.latest_key(get_realtime_db().reference(store.path))
     except Exception as e:
         st.error(f"Error getting latest reference number: {e}")
         return None
@@ -110,12 +433,8 @@ def get_latest_reference_number():
 
 def get_latest_aftersales_reference_number():
     try:
-        ref = realtime_db.reference('/aftersales')
-        records = ref.get() or {}
-        if not records:
-            return None
-        latest_ref = max(records.keys())
-        return latest_ref
+        store = _record_store("After Sales")
+        return store.latest_key(get_realtime_db().reference(store.path))
     except Exception as e:
         st.error(f"Error getting latest aftersales reference number: {e}")
         return None
@@ -123,21 +442,16 @@ def get_latest_aftersales_reference_number():
 
 def delete_record(reference_number, reference_type="New Reference"):
     try:
-        get_records.clear()
         if not reference_number:
             raise ValueError(
                 "Reference number is required to delete a record.")
-        if reference_type == "New Reference":
-            node_path = f'/forms/{reference_number}'
-        elif reference_type == "After Sales":
-            node_path = f'/aftersales/{reference_number}'
-        else:
-            raise ValueError(
-                "Invalid reference type. Must be 'New Reference' or 'After Sales'.")
-        node_ref = realtime_db.reference(node_path)
+        node_path = f'{_record_path(reference_type)}/{reference_number}'
+        node_ref = get_realtime_db().reference(node_path)
         record_data = node_ref.get()
         print(record_data)
         node_ref.delete()
+        _record_store(reference_type).remove(reference_number)
+        _record_cache().invalidate((reference_type, reference_number))
         log_user_action("Delete Record", record_data, reference_number)
         return True
     except Exception as e:
@@ -148,20 +462,130 @@ def delete_record(reference_number, reference_type="New Reference"):
 @st.cache_data(ttl=60)
 def get_logs():
     try:
-        ref = realtime_db.reference('/logs')
+        ref = get_realtime_db().reference('/logs')
         return ref.get() or {}
     except Exception as e:
         st.error(f"Error getting logs: {e}")
         return {}
 
 
+def _log_key(value, end_of_day=False):
+    """Translate a date/datetime bound into the /logs key format (%Y%m%d%H%M%S%f)."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y%m%d%H%M%S%f")
+    return value.strftime("%Y%m%d") + ("235959999999" if end_of_day else "000000000000")
+
+
+@st.cache_data(ttl=60)
+def get_logs_page(cursor=None, limit=10, since=None, until=None):
+    """Return one page of logs, newest first, and the cursor for the next (older) page.
+
+    Log IDs are UTC timestamps, so ordering by key is chronological. ``cursor``
+    is the oldest log ID of the previous page; ``since``/``until`` are dates or
+    datetimes bounding the window. The next cursor is None on the last page.
+    """
+    try:
+        query = get_realtime_db().reference('/logs').order_by_key()
+        if since:
+            query = query.start_at(_log_key(since))
+        upper = _log_key(until, end_of_day=True) if until else None
+        if cursor and (upper is None or cursor < upper):
+            upper = cursor
+        if upper:
+            query = query.end_at(upper)
+        # end_at is inclusive, so one extra row covers the cursor itself
+        entries = query.limit_to_last(limit + 2).get() or {}
+
+        keys = sorted((k for k in entries if k != cursor), reverse=True)
+        page_keys = keys[:limit]
+        next_cursor = page_keys[-1] if len(keys) > limit else None
+        return [(k, entries[k]) for k in page_keys], next_cursor
+    except Exception as e:
+        st.error(f"Error getting logs: {e}")
+        return [], None
+
+
+# Marker node written once every pre-existing log has been indexed
+LOG_INDEX_META = 'log_index_meta'
+_log_index_lock = threading.Lock()
+_log_index_built = False
+
+
+@st.cache_data(ttl=60)
+def search_logs(query, prefix=True, limit=200):
+    """Find logs by reference number, user email/name, PIC or action.
+
+    Answered from the /log_index nodes written alongside each log, so only
+    matching entries are read. Returns [(log_id, summary)] newest first.
+    """
+    try:
+        ensure_log_index()
+        results = log_index.search(get_realtime_db(), query, prefix=prefix, limit=limit)
+        return sorted(results.items(), reverse=True)
+    except Exception as e:
+        st.error(f"Error searching logs: {e}")
+        return []
+
+
+def get_log(log_id):
+    """Read a single log entry."""
+    try:
+        return get_realtime_db().reference(f'/logs/{log_id}').get() or {}
+    except Exception as e:
+        st.error(f"Error getting log: {e}")
+        return {}
+
+
+def rebuild_log_index():
+    """Index every existing /logs entry and mark the index as built.
+
+    Returns the number of logs indexed, or None on failure.
+    """
+    try:
+        logs = get_realtime_db().reference('/logs').get() or {}
+        log_ids = list(logs)
+        for start in range(0, len(log_ids), 500):
+            updates = {}
+            for log_id in log_ids[start:start + 500]:
+                updates.update(log_index.index_paths(log_id, logs[log_id]))
+            if updates:
+                get_realtime_db().reference('/').update(updates)
+        get_realtime_db().reference(f'/{LOG_INDEX_META}').set(
+            {'built': True, 'count': len(logs), 'builtAt': {".sv": "timestamp"}})
+        search_logs.clear()
+        return len(logs)
+    except Exception as e:
+        st.error(f"Error rebuilding log index: {e}")
+        return None
+
+
+def ensure_log_index():
+    """Backfill the search index once, for logs written before indexing existed.
+
+    Checked once per process; /log_index_meta/built records that the backfill
+    has run, so only the first search against an unindexed database pays for it.
+    """
+    global _log_index_built
+    if _log_index_built:
+        return
+    with _log_index_lock:
+        if _log_index_built:
+            return
+        if not get_realtime_db().reference(f'/{LOG_INDEX_META}/built').get():
+            with st.spinner("Indexing existing logs for search..."):
+                if rebuild_log_index() is None:
+                    return
+        _log_index_built = True
+
+
 def save_log(log_id, data):
     try:
         get_logs.clear()
+        get_logs_page.clear()
         if not log_id or any(c in log_id for c in '$#[]/.'):
             raise ValueError("Invalid log ID for Firebase path.")
 
-        node_ref = realtime_db.reference(f'/logs/{log_id}')
+        node_ref = get_realtime_db().reference(f'/logs/{log_id}')
         node_ref.set(data)
         return True
     except Exception as e:
@@ -172,11 +596,17 @@ def save_log(log_id, data):
 def delete_log(log_id):
     try:
         get_logs.clear()
+        get_logs_page.clear()
         if not log_id:
             raise ValueError("Log ID is required to delete a log entry.")
 
-        node_ref = realtime_db.reference(f'/logs/{log_id}')
-        node_ref.delete()
+        node_ref = get_realtime_db().reference(f'/logs/{log_id}')
+        entry = node_ref.get() or {}
+        # Remove the log and its index nodes in one multi-path update
+        updates = {path: None for path in log_index.index_paths(log_id, entry)}
+        updates[f'logs/{log_id}'] = None
+        get_realtime_db().reference('/').update(updates)
+        search_logs.clear()
         return True
     except Exception as e:
         st.error(f"Error deleting log: {e}")
@@ -186,7 +616,7 @@ def delete_log(log_id):
 @st.cache_data(ttl=60)
 def get_announcements():
     try:
-        ref = realtime_db.reference('/announcements')
+        ref = get_realtime_db().reference('/announcements')
         return ref.get() or {}
     except Exception as e:
         st.error(f"Error getting announcements: {e}")
@@ -199,7 +629,7 @@ def save_announcement(announcement_id, data):
         if not announcement_id or any(c in announcement_id for c in '$#[]/.'):
             raise ValueError("Invalid announcement ID for Firebase path.")
 
-        node_ref = realtime_db.reference(f'/announcements/{announcement_id}')
+        node_ref = get_realtime_db().reference(f'/announcements/{announcement_id}')
         node_ref.set(data)
         return True
     except Exception as e:
@@ -214,7 +644,7 @@ def delete_announcement(announcement_id):
             raise ValueError(
                 "Announcement ID is required to delete an announcement.")
 
-        node_ref = realtime_db.reference(f'/announcements/{announcement_id}')
+        node_ref = get_realtime_db().reference(f'/announcements/{announcement_id}')
         node_ref.delete()
         return True
     except Exception as e:
@@ -222,31 +652,33 @@ def delete_announcement(announcement_id):
         return False
 
 
-def convert_dates_in_record(record):
-    if isinstance(record, dict):
-        for k, v in record.items():
-            if isinstance(v, str):
-                try:
-                    parsed = datetime.fromisoformat(v)
-                    record[k] = parsed.date() if parsed.time(
-                    ) == datetime.min.time() else parsed
-                except Exception:
-                    pass
-            elif isinstance(v, dict):
-                convert_dates_in_record(v)
-            elif isinstance(v, list):
-                for item in v:
-                    if isinstance(item, dict):
-                        convert_dates_in_record(item)
-    return record
-
-
-def log_user_action(action, changed_details, reference_number):
+@st.cache_resource
+def _audit_log_writer():
+    """Process-wide background writer for Firestore `logs` and RTDB /logs."""
+    return AuditLogWriter(get_firestore, get_realtime_db,
+                          spool_path="./.cache/audit_log_spool.jsonl")
+
+
+def get_audit_log_error():
+    """(time.time(), message) of the audit log writer's latest unresolved failure, or None."""
+    return _audit_log_writer().last_error
+
+
+_log_clock_lock = threading.Lock()
+_last_log_time = datetime.min
+
+
+def _next_log_time():
+    """UTC now, nudged forward so log IDs written by this process never collide."""
+    global _last_log_time
+    with _log_clock_lock:
+        _last_log_time = max(datetime.utcnow(), _last_log_time + timedelta(microseconds=1))
+        return _last_log_time
+
+
+def log_user_action(action, changed_details, reference_number, pic=None):
     try:
-        firestore_db = db
-        user_ref = firestore_db.collection('users').document(
-            st.session_state.current_user['uid'])
-        user_data = user_ref.get().to_dict()
+        user_data = get_user_profile(st.session_state.current_user['uid'])
         user_name = user_data.get('first_name', 'Unknown')
         company_value = user_data.get('company', '')
         user_email = user_data.get('email', '')
@@ -267,10 +699,15 @@ def log_user_action(action, changed_details, reference_number):
             }
         }
 
-        log_ref = firestore_db.collection('logs').add(log_entry)
-        # Also save to Realtime Database under /logs/{timestamp}
-        timestamp_key = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
-        realtime_db.reference(f'/logs/{timestamp_key}').set(log_entry)
+        # Edit entries only carry a changeset, so the PIC is recorded on its own
+        if pic:
+            log_entry["pic"] = pic
+
+        # Written to Firestore `logs` and RTDB /logs/{timestamp} in the background,
+        # together with the /log_index nodes used by search_logs
+        timestamp_key = _next_log_time().strftime("%Y%m%d%H%M%S%f")
+        _audit_log_writer().submit(
+            timestamp_key, log_entry, log_index.index_paths(timestamp_key, log_entry))
         return True
     except Exception as e:
         st.error(f"Error logging user action: {e}")
@@ -0,0 +1,158 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+# Firestore allows at most 500 writes per WriteBatch
+MAX_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """Background writer for audit log entries.
+
+    ``submit`` only enqueues; a worker thread groups entries into one
+    Firestore WriteBatch commit plus one multi-path Realtime Database
+    ``update()`` per batch, flushing when ``batch_size`` entries are waiting
+    or ``flush_interval`` seconds have passed. Batches that fail to write are
+    appended to a local JSON-lines spool and replayed on the next successful
+    flush. Pending entries are drained at interpreter exit.
+
+    Each entry may carry extra Realtime Database paths (e.g. secondary index
+    nodes) that are written in the same multi-path update.
+
+    Failures are logged, and ``last_error`` keeps the latest one until a
+    write and spool replay succeed, so pages can show that entries are waiting.
+    """
+
+    def __init__(self, get_firestore, get_realtime_db, spool_path,
+                 max_queue=1000, batch_size=50, flush_interval=2.0):
+        self._get_firestore = get_firestore
+        self._get_realtime_db = get_realtime_db
+        self.spool_path = spool_path
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._spool_lock = threading.Lock()
+        # (time.time(), message) of the latest failed write, None once writes succeed again
+        self.last_error = None
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(
+            target=self._run, name="audit-log-writer", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def submit(self, log_id, entry, rtdb_paths=None):
+        """Queue one entry stored as logs/{log_id}; spooled directly when the queue is full."""
+        item = (log_id, entry, rtdb_paths or {})
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._spool([item])
+
+    def flush(self):
+        """Block until every queued entry has been written or spooled."""
+        self._queue.join()
+
+    def close(self, timeout=10):
+        """Stop the worker after draining the queue."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._worker.join(timeout)
+
+    def _run(self):
+        # Entries spooled by a previous process are retried straight away
+        self._replay_spool()
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _collect(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (self._stopped.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _write(self, batch):
+        try:
+            self._commit(batch)
+        except Exception as e:
+            logger.warning("Audit log backend unavailable, spooling %d entries: %s", len(batch), e)
+            self.last_error = (time.time(), f"Audit log backend unavailable: {e}")
+            self._spool(batch)
+            return
+        if self._replay_spool():
+            self.last_error = None
+
+    def _commit(self, batch):
+        firestore_db = self._get_firestore()
+        for start in range(0, len(batch), MAX_BATCH_SIZE):
+            write_batch = firestore_db.batch()
+            for log_id, entry, _ in batch[start:start + MAX_BATCH_SIZE]:
+                # log_id as the document id keeps spool replays idempotent
+                write_batch.set(firestore_db.collection('logs').document(log_id), entry)
+            write_batch.commit()
+
+        updates = {}
+        for log_id, entry, rtdb_paths in batch:
+            updates[f'logs/{log_id}'] = entry
+            updates.update(rtdb_paths)
+        self._get_realtime_db().reference('/').update(updates)
+
+    def _spool(self, batch):
+        with self._spool_lock:
+            os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for log_id, entry, rtdb_paths in batch:
+                    f.write(json.dumps(
+                        {"id": log_id, "entry": entry, "paths": rtdb_paths}, default=str) + "\n")
+
+    def _replay_spool(self):
+        """Write spooled entries; returns False if any are still spooled."""
+        try:
+            return self._replay_spool_entries()
+        except Exception as e:
+            logger.exception("Could not replay audit log spool")
+            self.last_error = (time.time(), f"Could not replay audit log spool: {e}")
+            return False
+
+    def _replay_spool_entries(self):
+        with self._spool_lock:
+            if not os.path.exists(self.spool_path):
+                return True
+            with open(self.spool_path, encoding="utf-8") as f:
+                spooled = [json.loads(line) for line in f if line.strip()]
+            os.remove(self.spool_path)
+        if not spooled:
+            return True
+        batch = [(item["id"], item["entry"], item.get("paths", {})) for item in spooled]
+        for start in range(0, len(batch), MAX_BATCH_SIZE):
+            chunk = batch[start:start + MAX_BATCH_SIZE]
+            try:
+                self._commit(chunk)
+            except Exception as e:
+                logger.warning("Audit log spool replay failed, %d entries still spooled: %s",
+                               len(batch) - start, e)
+                self.last_error = (time.time(), f"Audit log spool replay failed: {e}")
+                self._spool(batch[start:])
+                return False
+        logger.info("Replayed %d spooled audit log entries", len(batch))
+        return True
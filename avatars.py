@@ -0,0 +1,196 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+from PIL import Image, ImageOps
+from requests.adapters import HTTPAdapter
+
+DEFAULT_AVATAR = './pics/user.jpg'
+AVATAR_CACHE_DIR = './.cache/avatars'
+# Thumbnails are square, and large enough for the 80px profile header on HiDPI screens
+AVATAR_SIZE = 160
+AVATAR_MIME = 'image/webp'
+# Square renditions stored for each uploaded profile picture
+RENDITION_SIZES = (64, AVATAR_SIZE, 512)
+
+
+def _decode(data, size):
+    """Decode an image, upright, at no less than ``size`` pixels on its short side if possible."""
+    img = Image.open(io.BytesIO(data))
+    # JPEGs can be decoded straight at a reduced scale, far cheaper than a full decode
+    img.draft('RGB', (size, size))
+    img = ImageOps.exif_transpose(img)
+    return img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+
+
+def _encode(img, size):
+    out = io.BytesIO()
+    ImageOps.fit(img, (size, size), Image.LANCZOS).save(out, format='WEBP', quality=85, method=4)
+    return out.getvalue()
+
+
+def make_thumbnail(data, size=AVATAR_SIZE):
+    """Square, EXIF-oriented WebP thumbnail of an encoded image."""
+    return _encode(_decode(data, size), size)
+
+
+def make_renditions(data, sizes=RENDITION_SIZES):
+    """{size: WebP bytes} for an uploaded picture; re-encoding drops EXIF and other metadata."""
+    img = _decode(data, max(sizes))
+    return {size: _encode(img, size) for size in sizes}
+
+
+def pick_rendition(user, px=AVATAR_SIZE):
+    """URL of the smallest stored rendition at least ``px`` wide, else the best available."""
+    renditions = {int(size): url for size, url in (user.get('photo_renditions') or {}).items() if url}
+    if renditions:
+        fits = [size for size in renditions if size >= px]
+        return renditions[min(fits) if fits else max(renditions)]
+    return user.get('photo_url') or DEFAULT_AVATAR
+
+
+class AvatarCache:
+    """Thumbnail bytes per image URL: memory LRU, then disk, then a parallel fetch.
+
+    Entries are keyed by URL and remember the server's ETag; after
+    ``revalidate_after`` seconds a conditional GET (If-None-Match) checks that
+    the image has not changed. Local file paths use their mtime as the ETag.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, cache_dir=AVATAR_CACHE_DIR, workers=8,
+                 timeout=5, revalidate_after=3600):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.revalidate_after = revalidate_after
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='avatar')
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        self._default = None
+
+    def get(self, url):
+        return self.get_many([url])[url]
+
+    def get_many(self, urls):
+        """{url: thumbnail bytes} for every URL, fetching misses concurrently."""
+        result, stale = {}, {}
+        now = time.time()
+        with self._lock:
+            for url in dict.fromkeys(urls):
+                entry = self._entries.get(url)
+                if entry is not None:
+                    self._entries.move_to_end(url)
+                    result[url] = entry[1]
+                    if now - entry[2] < self.revalidate_after:
+                        continue
+                stale[url] = entry
+        if stale:
+            futures = {url: self._pool.submit(self._load, url, entry) for url, entry in stale.items()}
+            for url, future in futures.items():
+                try:
+                    result[url] = future.result()
+                except Exception:
+                    result[url] = result.get(url) or self.default()
+        return result
+
+    def data_uri(self, data):
+        return f"data:{AVATAR_MIME};base64,{base64.b64encode(data).decode('ascii')}"
+
+    def default(self):
+        if self._default is None:
+            with open(DEFAULT_AVATAR, 'rb') as f:
+                self._default = make_thumbnail(f.read())
+        return self._default
+
+    # ------------------------ Loading ------------------------
+
+    def _load(self, url, entry):
+        if not url:
+            return self.default()
+        if entry is None:
+            entry = self._read_disk(url)
+            if entry is not None and time.time() - entry[2] < self.revalidate_after:
+                self._store(url, entry[0], entry[1], entry[2])
+                return entry[1]
+        if url.startswith('http'):
+            etag, data = self._fetch(url, entry)
+        else:
+            etag = str(os.path.getmtime(url))
+            if entry is not None and entry[0] == etag:
+                data = entry[1]
+            else:
+                with open(url, 'rb') as f:
+                    data = make_thumbnail(f.read())
+        # Rewriting an unchanged entry just marks it as checked now
+        self._write_disk(url, etag, data if entry is None or entry[0] != etag else None)
+        self._store(url, etag, data, time.time())
+        return data
+
+    def _fetch(self, url, entry):
+        headers = {'If-None-Match': entry[0]} if entry and entry[0] else {}
+        response = self._session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and entry is not None:
+            return entry[0], entry[1]
+        response.raise_for_status()
+        return response.headers.get('ETag', ''), make_thumbnail(response.content)
+
+    def _store(self, url, etag, data, checked_at):
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[url] = (etag, data, checked_at)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[1])
+
+    # ------------------------ Disk cache ------------------------
+
+    def _disk_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest())
+
+    def _read_disk(self, url):
+        """(etag, data, checked_at) from disk, or None."""
+        path = self._disk_path(url)
+        try:
+            with open(path + '.json') as f:
+                meta = json.load(f)
+            if meta.get('url') != url:
+                return None
+            with open(path + '.webp', 'rb') as f:
+                return meta.get('etag', ''), f.read(), meta.get('checked_at', 0)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, url, etag, data=None):
+        """Save the thumbnail (if given) and its ETag, stamped as checked now."""
+        path = self._disk_path(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if data is not None:
+                with open(path + '.webp', 'wb') as f:
+                    f.write(data)
+            with open(path + '.json', 'w') as f:
+                json.dump({'url': url, 'etag': etag, 'checked_at': time.time()}, f)
+        except OSError:
+            pass
+
+
+@st.cache_resource(show_spinner=False)
+def get_avatar_cache():
+    """Process-wide avatar cache shared by every session."""
+    return AvatarCache()
@@ -0,0 +1,96 @@
+"""Team-grid avatar cost: sequential fetch + PNG re-encode vs avatars.AvatarCache.
+
+Serves 50 synthetic photos from a local HTTP server that adds a fixed delay per
+request (default 100ms), then times one grid render each way. Run from the
+repository root: ``python benchmarks/bench_avatars.py [users] [delay_ms]``.
+"""
+import base64
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from avatars import AvatarCache  # noqa: E402
+
+PHOTOS = {}
+DELAY = 0.1
+
+
+class PhotoHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(DELAY)
+        data = PHOTOS.get(self.path)
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_photo(seed):
+    img = Image.new('RGB', (1600, 1200), ((seed * 37) % 255, (seed * 91) % 255, 120))
+    out = io.BytesIO()
+    img.save(out, format='JPEG', quality=90)
+    return out.getvalue()
+
+
+def legacy_render(urls):
+    """load_image + Image_to_base64 as the Users page did it."""
+    for url in urls:
+        img = Image.open(io.BytesIO(requests.get(url, timeout=5).content))
+        buffered = io.BytesIO()
+        img.save(buffered, format='PNG')
+        base64.b64encode(buffered.getvalue())
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    global DELAY
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    DELAY = (float(sys.argv[2]) if len(sys.argv) > 2 else 100) / 1000
+    for i in range(users):
+        PHOTOS[f'/u{i}.jpg'] = make_photo(i)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PhotoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f'http://127.0.0.1:{server.server_port}/u{i}.jpg' for i in range(users)]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = AvatarCache(cache_dir=cache_dir)
+        print(f"{users} users, {DELAY * 1000:g}ms per request")
+        print(f"legacy (sequential, every rerun)  {timed(lambda: legacy_render(urls)) * 1000:>8.0f}ms")
+        print(f"avatar cache, cold                {timed(lambda: cache.get_many(urls)) * 1000:>8.0f}ms")
+        print(f"avatar cache, warm rerun          {timed(lambda: cache.get_many(urls)) * 1000:>8.1f}ms")
+        restarted = AvatarCache(cache_dir=cache_dir)
+        print(f"after restart (disk)              {timed(lambda: restarted.get_many(urls)) * 1000:>8.0f}ms")
+        expired = AvatarCache(cache_dir=cache_dir, revalidate_after=0)
+        print(f"after restart, expired (304s)     {timed(lambda: expired.get_many(urls)) * 1000:>8.0f}ms")
+        sizes = cache.get_many(urls[:1])[urls[0]]
+        print(f"bytes per avatar: original {len(PHOTOS['/u0.jpg'])}, thumbnail {len(sizes)}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
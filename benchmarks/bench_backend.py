@@ -0,0 +1,85 @@
+"""End-to-end api.py latency against the local Firebase stand-in.
+
+Seeds the local backend with synthetic records, then times the main api
+calls with a simulated round-trip latency and reports how many round trips
+each one made. Run from the repository root:
+
+    python benchmarks/bench_backend.py [records] [latency_ms]
+"""
+import contextlib
+import csv
+import io
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["SMARTSOURCING_BACKEND"] = "local"
+
+import streamlit as st  # noqa: E402
+
+import api  # noqa: E402
+from bench_dates import make_records  # noqa: E402
+from firebase_config import _local_backend  # noqa: E402
+from record_schema import COLUMN_LABELS, FIELDS  # noqa: E402
+
+
+def seed(backend, count):
+    latency, backend.latency = backend.latency, 0
+    backend.rtdb.reference("/forms").set(make_records(count))
+    backend.firestore.collection("users").document("bench").set(
+        {"first_name": "Bench", "last_name": "User", "email": "bench@example.com", "company": "ECP"})
+    backend.latency = latency
+
+
+def import_file(rows, start):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([COLUMN_LABELS[spec.name] for spec in FIELDS])
+    for i in range(start, start + rows):
+        writer.writerow([f"IMP-{i:06d}" if spec.name == "referenceNumber" else
+                         "2024-01-01" if spec.is_date else "x" for spec in FIELDS])
+    return buffer.getvalue().encode()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    os.environ["SMARTSOURCING_LOCAL_LATENCY_MS"] = str(latency_ms)
+    # Bare-mode Streamlit warns on every cached call; keep the table readable
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    backend = _local_backend()
+    seed(backend, count)
+    st.session_state.current_user = {"uid": "bench"}
+
+    record = make_records(1, seed=1)["SS-000000"]
+    edited = {**record, "customerForm": {**record["customerForm"], "status": "Closed"}}
+    refs = [f"SS-{i:06d}" for i in range(50)]
+    steps = [
+        ("get_record_rows (cold load)", lambda: api.get_record_rows()),
+        ("get_record_rows (synced)", lambda: api.get_record_rows()),
+        ("get_record", lambda: api.get_record("SS-000010")),
+        ("save_record create", lambda: api.save_record("SS-NEW", record, "New Reference", "Create")),
+        ("save_record edit", lambda: api.save_record("SS-NEW", edited, "New Reference", "Edit")),
+        ("bulk_update_field x50", lambda: api.bulk_update_field(refs, "status", "DV")),
+        ("import_records 1,000 rows", lambda: api.import_records(
+            import_file(1_000, 0), "bench.csv", "New Reference")),
+        # Waits for the background writer, including its batching interval
+        ("audit log flush", lambda: api._audit_log_writer().flush()),
+        ("get_logs_page", lambda: api.get_logs_page()),
+        ("search_logs", lambda: api.search_logs("ss-0000")),
+    ]
+    print(f"{count} records, {latency_ms:g}ms simulated latency per call")
+    print(f"{'operation':<28} {'time':>10} {'round trips':>12}")
+    for name, step in steps:
+        calls = backend.calls
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            step()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<28} {elapsed * 1000:>8.1f}ms {backend.calls - calls:>12}")
+
+
+if __name__ == "__main__":
+    main()
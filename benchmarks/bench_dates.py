@@ -0,0 +1,120 @@
+"""Record conversion cost per cache refill: recursive date walk vs typed record_schema records.
+
+Run from the repository root: ``python benchmarks/bench_dates.py``.
+"""
+import copy
+import datetime
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_schema import SECTIONS, records_from_firebase  # noqa: E402
+
+
+def legacy_convert_dates_in_record(record):
+    """The recursive converter previously in api.py and pages/Home.py."""
+    if isinstance(record, dict):
+        for k, v in record.items():
+            if isinstance(v, str):
+                try:
+                    parsed = datetime.datetime.fromisoformat(v)
+                    record[k] = parsed.date() if parsed.time(
+                    ) == datetime.datetime.min.time() else parsed
+                except Exception:
+                    pass
+            elif isinstance(v, dict):
+                legacy_convert_dates_in_record(v)
+            elif isinstance(v, list):
+                for item in v:
+                    if isinstance(item, dict):
+                        legacy_convert_dates_in_record(item)
+    return record
+
+
+def make_records(count, seed=0):
+    rng = random.Random(seed)
+    start = datetime.date(2022, 1, 1)
+
+    def day():
+        return "None" if rng.random() < 0.3 else str(start + datetime.timedelta(days=rng.randint(0, 1000)))
+
+    records = {}
+    for i in range(count):
+        ref = f"SS-{i:06d}"
+        records[ref] = {
+            "customerForm": {
+                "referenceNumber": ref, "name": f"Customer {rng.randint(1, 500)}",
+                "pic": "Ana", "status": "Open", "cpoDate": day(), "customerPoNo": f"PO-{i}",
+                "rfqDate": day(), "vendorQuoteDate": day(), "date": day(),
+                "quotationNumber": f"Q-{i}", "quotationDate": day(), "prfbackOrder": "",
+                "details": f"Supply of item batch {rng.randint(1, 10_000)}",
+            },
+            "billingOrderForm": {
+                "bofApproval": "", "bofNo": f"BOF-{i}", "forInvoice": "", "bofDate": day(),
+                "invoiceDateBilling": day(), "receivedDateBilling": day(),
+                "invoiceNumberBilling": "", "receivedByBilling": "",
+            },
+            "requestForPaymentForm": {
+                "receivedByRequest": "", "refNo": "", "receivedDateRequest": day(),
+                "refDate": day(), "rfpApproval": "", "rfpDate": day(), "rfpNo": "",
+            },
+            "vendorForm": {
+                "epoNo": "", "invoiceAmount": str(rng.randint(100, 100_000)), "invoiceDate": day(),
+                "invoiceNo": f"INV-{i}", "poDate": day(), "sentByandDate": "",
+                "supplierName": f"Supplier {rng.randint(1, 200)}",
+            },
+            "lastModified": 1_700_000_000_000 + i,
+        }
+    return records
+
+
+def timed(func, records, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        data = copy.deepcopy(records)
+        start = time.perf_counter()
+        result = func(data)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def footprint(func, records):
+    """(retained, peak) bytes allocated by ``func`` while converting a copy of ``records``."""
+    data = copy.deepcopy(records)
+    tracemalloc.start()
+    result = func(data)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+def legacy_convert(data):
+    return {k: legacy_convert_dates_in_record(copy.deepcopy(v)) for k, v in data.items()}
+
+
+def main():
+    print(f"{'records':>8} {'recursive':>10} {'typed':>10} {'speedup':>8}")
+    for count in (1_000, 10_000, 50_000):
+        records = make_records(count)
+        legacy_time, legacy = timed(
+            lambda data: {k: legacy_convert_dates_in_record(v) for k, v in data.items()}, records)
+        schema_time, converted = timed(records_from_firebase, records)
+        assert {k: r.to_dict() for k, r in converted.items()} == {
+            k: {section: v[section] for section in SECTIONS} for k, v in legacy.items()}
+        print(f"{count:>8} {legacy_time * 1000:>8.1f}ms {schema_time * 1000:>8.1f}ms "
+              f"{legacy_time / schema_time:>7.1f}x")
+
+    # The cached dicts vs typed records (the dict copy stands in for the cache's own copy)
+    records = make_records(10_000)
+    for label, func in (("dicts", legacy_convert), ("typed", records_from_firebase)):
+        retained, peak = footprint(func, records)
+        print(f"memory @10k records, {label}: {retained / 1e6:.1f}MB retained, {peak / 1e6:.1f}MB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""User directory lookups against the local Firebase stand-in.
+
+Compares the previous full scan of ``users`` and ``user_status`` with the
+incremental UserDirectory (which reads ``users`` only; presence is separate), reporting time and round trips. Run from the
+repository root:
+
+    python benchmarks/bench_directory.py [users] [latency_ms]
+"""
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firebase_admin.firestore import SERVER_TIMESTAMP  # noqa: E402
+
+from local_backend import LocalBackend  # noqa: E402
+from user_directory import UserDirectory  # noqa: E402
+
+
+def seed(db, count):
+    # Stamped a second apart over the past, so only later writes count as changes
+    start = datetime.now(timezone.utc) - timedelta(hours=1, seconds=count)
+    users, status = db.collection("users"), db.collection("user_status")
+    for i in range(count):
+        stamp = start + timedelta(seconds=i)
+        users.document(f"u{i:05d}").set({"email": f"user{i}@example.com", "first_name": f"User {i}",
+                                          "updated_at": stamp})
+        status.document(f"u{i:05d}").set({"last_online": stamp, "updated_at": stamp})
+
+
+def legacy_profile(db, uid):
+    """What get_profile_data did on a cache miss: scan both collections for one uid."""
+    status = {doc.id: doc.to_dict() for doc in db.collection("user_status").stream()}
+    users = [dict(doc.to_dict(), uid=doc.id, last_online=status.get(doc.id, {}).get("last_online"))
+             for doc in db.collection("users").stream()]
+    return next((u for u in users if u["uid"] == uid), None)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    backend = LocalBackend()
+    db = backend.firestore
+    seed(db, count)
+    backend.latency = latency_ms / 1000
+    directory = UserDirectory(db, refresh_interval=0)
+    cached = UserDirectory(db)
+    cached.users()
+
+    def touch():
+        db.collection("users").document("u00007").set(
+            {"bio": "Edited", "updated_at": SERVER_TIMESTAMP}, merge=True)
+
+    steps = [
+        ("legacy scan for one uid", lambda: legacy_profile(db, "u01234")),
+        ("directory first load", lambda: directory.users()),
+        ("get_user (no changes)", lambda: directory.get_user("u01234")),
+        ("edit one profile", touch),
+        ("get_user (1 changed doc)", lambda: directory.get_user("u00007")),
+        ("get_user (within 30s)", lambda: cached.get_user("u01234")),
+    ]
+    print(f"{count} users, {latency_ms:g}ms simulated latency per call")
+    print(f"{'operation':<28} {'time':>10} {'round trips':>12}")
+    for name, step in steps:
+        calls = backend.calls
+        start = time.perf_counter()
+        step()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<28} {elapsed * 1000:>8.1f}ms {backend.calls - calls:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Latency of the View Tables search/date filter at 1k, 10k and 100k rows.
+
+Compares the previous row-wise ``df.apply`` filter with records_table.FilterIndex.
+Run from the repository root: ``python benchmarks/bench_filters.py``.
+"""
+import datetime
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records_table import FilterIndex, apply_filters  # noqa: E402
+
+STATUSES = ["Open", "QV", "QC", "POC", "POV", "DV", "DC", "BOF", "RFP", "Closed", "Cancelled"]
+
+
+def make_frame(rows, seed=0):
+    rng = random.Random(seed)
+    start = datetime.date(2022, 1, 1)
+    data = {
+        "referenceNumber": [f"SS-{i:06d}" for i in range(rows)],
+        "name": [f"Customer {rng.randint(1, 500)}" for _ in range(rows)],
+        "date": [start + datetime.timedelta(days=rng.randint(0, 1000)) for _ in range(rows)],
+        "details": [f"Supply of item batch {rng.randint(1, 10_000)}" for _ in range(rows)],
+        "pic": [rng.choice(["Ana", "Ben", "Carla", "Dan"]) for _ in range(rows)],
+        "status": [rng.choice(STATUSES) for _ in range(rows)],
+        "cpoDate": [start + datetime.timedelta(days=rng.randint(0, 1000)) for _ in range(rows)],
+        "supplierName": [f"Supplier {rng.randint(1, 200)}" for _ in range(rows)],
+        "invoiceNo": [f"INV-{rng.randint(1, 99_999)}" for _ in range(rows)],
+        "invoiceAmount": [str(rng.randint(100, 100_000)) for _ in range(rows)],
+    }
+    return pd.DataFrame(data)
+
+
+def legacy_apply_filters(df, search_term, date_col, start_date, end_date):
+    """The filter as it was before FilterIndex."""
+    filtered_df = df.copy()
+    if search_term:
+        search_term = search_term.lower()
+        filtered_df = filtered_df[filtered_df.apply(
+            lambda row: row.astype(str).str.lower().str.contains(search_term).any(),
+            axis=1
+        )]
+    if date_col and date_col in filtered_df.columns and start_date and end_date:
+        filtered_df[date_col] = pd.to_datetime(
+            filtered_df[date_col], errors='coerce', dayfirst=True)
+        filtered_df = filtered_df[
+            (filtered_df[date_col] >= pd.to_datetime(start_date)) &
+            (filtered_df[date_col] <= pd.to_datetime(end_date))
+        ]
+    return filtered_df
+
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    args = ("batch 42", "cpoDate", datetime.date(2023, 1, 1), datetime.date(2023, 12, 31))
+    print(f"{'rows':>8} {'legacy':>10} {'index build':>12} {'filter':>10} {'speedup':>8}")
+    for rows in (1_000, 10_000, 100_000):
+        df = make_frame(rows)
+        legacy_time, legacy = timed(
+            lambda: legacy_apply_filters(df, *args), 1 if rows >= 100_000 else 3)
+        build_time, index = timed(lambda: FilterIndex(df), 1)
+        filter_time, result = timed(lambda: apply_filters(df, index, *args), 5)
+        assert list(result.index) == list(legacy.index)
+        print(f"{rows:>8} {legacy_time * 1000:>8.1f}ms {build_time * 1000:>10.1f}ms "
+              f"{filter_time * 1000:>8.2f}ms {legacy_time / filter_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Typeahead latency of name_index.NameIndex.suggest at 1k, 10k and 50k names.
+
+Run from the repository root: ``python benchmarks/bench_names.py``.
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_index import NameIndex  # noqa: E402
+
+SUFFIXES = ["Corp.", "Inc", "Trading", "Enterprises", "Industrial Supply", "Philippines Inc."]
+
+
+def make_names(count, seed=0):
+    rng = random.Random(seed)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))).title()
+
+    return [f"{word()} {word()} {rng.choice(SUFFIXES)}" for _ in range(count)]
+
+
+def main():
+    print(f"{'names':>8} {'build':>10} {'prefix':>10} {'fuzzy':>10}")
+    for count in (1_000, 10_000, 50_000):
+        names = make_names(count)
+        start = time.perf_counter()
+        index = NameIndex(names)
+        build = time.perf_counter() - start
+
+        rng = random.Random(1)
+        samples = rng.sample(names, 200)
+        prefixes = [name[:4] for name in samples]
+        # Typos: one character dropped from the middle of a real name
+        typos = [name[:len(name) // 2] + name[len(name) // 2 + 1:] for name in samples]
+        timings = []
+        for queries in (prefixes, typos):
+            start = time.perf_counter()
+            for query in queries:
+                index.suggest(query, k=10)
+            timings.append((time.perf_counter() - start) / len(queries))
+        hits = sum(name in index.suggest(typo, k=10) for name, typo in zip(samples, typos))
+        print(f"{count:>8} {build * 1000:>8.1f}ms {timings[0] * 1e6:>8.1f}us "
+              f"{timings[1] * 1e6:>8.1f}us  (typo recall {hits / len(typos):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Presence heartbeat writes against the local Firebase stand-in.
+
+Simulates signed-in sessions rerunning the Users page (e.g. typing in the
+team search box) and counts the user_status writes made by the previous
+write-per-render heartbeat and by the debounced Presence service, then how
+long another app instance takes to see a user come online with the snapshot
+listener and with polling. Run from the repository root:
+
+    python benchmarks/bench_presence.py [sessions] [reruns] [latency_ms]
+"""
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_backend import LocalBackend  # noqa: E402
+from presence import Presence  # noqa: E402
+
+
+def legacy_heartbeat(db, uid):
+    now = datetime.now(timezone.utc)
+    db.collection("user_status").document(uid).set({"last_online": now, "updated_at": now}, merge=True)
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 50
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    backend = LocalBackend(latency=latency_ms / 1000)
+    db = backend.firestore
+    uids = [f"u{i:04d}" for i in range(sessions)]
+    print(f"{sessions} sessions x {reruns} reruns, {latency_ms:g}ms simulated latency per call")
+    print(f"{'heartbeat':<28} {'time in reruns':>15} {'round trips':>12}")
+
+    calls, start = backend.calls, time.perf_counter()
+    for _ in range(reruns):
+        for uid in uids:
+            legacy_heartbeat(db, uid)
+    print(f"{'write on every render':<28} {(time.perf_counter() - start) * 1000:>13.1f}ms "
+          f"{backend.calls - calls:>12}")
+
+    presence = Presence(db)
+    presence.refresh()
+    calls, start = backend.calls, time.perf_counter()
+    for _ in range(reruns):
+        for uid in uids:
+            presence.heartbeat(uid)
+            presence.is_online(uid)
+    elapsed = time.perf_counter() - start
+    presence.close()
+    print(f"{'debounced, batched':<28} {elapsed * 1000:>13.1f}ms {backend.calls - calls:>12}")
+
+    # How long until another app instance sees a user come online
+    print(f"{'observer':<28} {'seen after':>15} {'round trips':>12}")
+    for name, listen in (("snapshot listener", True), ("polling every 30s", False)):
+        writer, observer = Presence(db), Presence(db, listen=listen)
+        observer.refresh()
+        uid = f"new-{name}"
+        calls, start = backend.calls, time.perf_counter()
+        writer.heartbeat(uid)
+        while not observer.is_online(uid):
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<28} {elapsed * 1000:>13.0f}ms {backend.calls - calls:>12}")
+        writer.close()
+        observer.close()
+
+
+if __name__ == "__main__":
+    main()
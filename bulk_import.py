@@ -0,0 +1,130 @@
+import csv
+import datetime
+import hashlib
+import io
+
+from openpyxl import load_workbook
+
+from record_schema import COLUMN_LABELS, FIELDS, FIELDS_BY_NAME, SECTIONS, STATUSES, parse_date
+
+IMPORT_FORMATS = ("xlsx", "csv")
+# Header text (View Tables label or field name, case-insensitive) -> field name
+HEADER_FIELDS = {
+    **{name.lower(): name for name in FIELDS_BY_NAME},
+    **{label.lower(): name for name, label in COLUMN_LABELS.items()},
+}
+# Status text (case-insensitive) -> the STATUSES spelling
+STATUS_VALUES = {status.lower(): status for status in STATUSES}
+
+
+def import_id(content, form_type):
+    """Stable id for an upload, so importing the same file again resumes it."""
+    digest = hashlib.sha1(content)
+    digest.update(form_type.encode())
+    return digest.hexdigest()[:20]
+
+
+def read_rows(content, filename):
+    """Yield the rows of an XLSX or CSV upload as tuples, header row first.
+
+    XLSX is read with a read-only (streaming) workbook, CSV line by line.
+    """
+    extension = filename.rsplit(".", 1)[-1].lower()
+    if extension == "xlsx":
+        workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    elif extension == "csv":
+        text = io.TextIOWrapper(io.BytesIO(content), encoding="utf-8-sig", newline="")
+        for row in csv.reader(text):
+            yield tuple(row)
+    else:
+        raise ValueError(f"Unsupported import format: .{extension}")
+
+
+def map_headers(headers):
+    """Field name for each header cell (None for unknown columns) and the unknown headers."""
+    columns, unknown = [], []
+    for header in headers:
+        text = "" if header is None else str(header).strip()
+        field = HEADER_FIELDS.get(text.lower())
+        columns.append(field)
+        if text and field is None:
+            unknown.append(text)
+    return columns, unknown
+
+
+def _date_value(value):
+    if value is None or (isinstance(value, str) and value.strip() in ("", "None")):
+        return "None"
+    if isinstance(value, datetime.datetime):
+        value = value.date() if value.time() == datetime.time() else value
+    if isinstance(value, str):
+        value = parse_date(value.strip())
+    if isinstance(value, datetime.date):
+        return str(value)
+    raise ValueError("not an ISO date (YYYY-MM-DD)")
+
+
+def _status_value(value):
+    """A status in its STATUSES spelling; blank becomes "Open", as in the form."""
+    text = "" if value is None else str(value).strip()
+    if not text:
+        return STATUSES[0]
+    status = STATUS_VALUES.get(text.lower())
+    if status is None:
+        raise ValueError(f"\"{text}\" is not one of {', '.join(STATUSES)}")
+    return status
+
+
+def row_to_record(values, columns):
+    """(reference number, record in save_all_data form, errors) for one data row."""
+    record = {section: {} for section in SECTIONS}
+    row = dict(zip(columns, values))
+    errors = []
+    for spec in FIELDS:
+        value = row.get(spec.name)
+        if spec.is_date:
+            try:
+                value = _date_value(value)
+            except ValueError as e:
+                errors.append(f"{spec.label}: {e}")
+                value = "None"
+        elif spec.name == "status":
+            try:
+                value = _status_value(value)
+            except ValueError as e:
+                errors.append(f"{spec.label}: {e}")
+                value = ""
+        else:
+            value = "" if value is None else str(value).strip()
+        record[spec.section][spec.name] = value
+
+    reference_number = record["customerForm"]["referenceNumber"].upper()
+    record["customerForm"]["referenceNumber"] = reference_number
+    if not reference_number:
+        errors.append("Ref No: missing")
+    elif any(c in reference_number for c in '$#[]/.'):
+        errors.append("Ref No: contains one of $ # [ ] / .")
+    return reference_number, record, errors
+
+
+def estimate_rows(content, filename):
+    """Approximate number of data rows in an upload, for progress reporting.
+
+    CSV rows are counted with the csv reader, so quoted cells spanning
+    several lines count once.
+    """
+    if filename.lower().endswith(".xlsx"):
+        workbook = load_workbook(io.BytesIO(content), read_only=True)
+        try:
+            return max((workbook.active.max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+    return max(sum(1 for _ in read_rows(content, filename)) - 1, 0)
+
+
+def is_blank(values):
+    return all(value is None or str(value).strip() == "" for value in values)
@@ -0,0 +1,103 @@
+import bisect
+import os
+import pickle
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from firebase_config import get_realtime_db
+from firebase_keys import index_key
+
+CUSTOMER_WORKBOOK = './pics/Customer Data.xlsx'
+CACHE_PATH = './.cache/customer_names.pkl'
+# Names typed in the forms that are not in the workbook
+CUSTOMERS_NODE = '/customers'
+
+
+class CustomerCatalog:
+    """Sorted customer names with case-insensitive membership."""
+
+    def __init__(self, names=()):
+        self._lock = threading.Lock()
+        self._names = []
+        self._keys = []
+        for name in sorted(set(n for n in names if n), key=str.lower):
+            self._names.append(name)
+            self._keys.append(name.lower())
+
+    def names(self):
+        """All names, sorted case-insensitively."""
+        return list(self._names)
+
+    def __contains__(self, name):
+        key = name.lower()
+        i = bisect.bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def add(self, name):
+        """Insert a name; returns False if it is already present."""
+        with self._lock:
+            if not name or name in self:
+                return False
+            i = bisect.bisect_left(self._keys, name.lower())
+            self._keys.insert(i, name.lower())
+            self._names.insert(i, name)
+            return True
+
+
+def read_workbook_names(path=CUSTOMER_WORKBOOK, cache_path=CACHE_PATH):
+    """Customer names from the workbook, via a pickle cache keyed by the file's mtime and size."""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('signature') == signature:
+            return cached['names']
+    except (OSError, pickle.PickleError, EOFError, AttributeError, KeyError):
+        pass
+
+    customer_df = pd.read_excel(path)
+    names = customer_df['CUSTOMER NAME'].dropna().astype(str).str.strip().unique().tolist()
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'wb') as f:
+            pickle.dump({'signature': signature, 'names': names}, f)
+    except OSError:
+        pass
+    return names
+
+
+@st.cache_resource(show_spinner=False)
+def get_customer_catalog():
+    """Process-wide catalog: workbook names plus names saved from the forms."""
+    names = list(read_workbook_names())
+    try:
+        saved = get_realtime_db().reference(CUSTOMERS_NODE).get() or {}
+        names.extend(saved.values())
+    except Exception as e:
+        st.error(f"Error loading saved customer names: {e}")
+    return CustomerCatalog(names)
+
+
+def customer_name_path(name):
+    """Multi-path update key that persists ``name`` under /customers."""
+    return f'{CUSTOMERS_NODE.strip("/")}/{index_key(name)}'
+
+
+def add_customer_name(name):
+    """Add a new customer name to the catalog and persist it under /customers.
+
+    Called once a record using the name has been saved, never while typing.
+    """
+    name = (name or "").strip()
+    catalog = get_customer_catalog()
+    if not catalog.add(name):
+        return False
+    try:
+        get_realtime_db().reference(customer_name_path(name)).set(name)
+        return True
+    except Exception as e:
+        st.error(f"Error saving customer name: {e}")
+        return False
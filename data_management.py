@@ -1,5 +1,6 @@
 import streamlit as st
 from datetime import datetime
+from record_schema import FIELDS, FIELD_NAMES, SECTIONS
 
 def initialize_session_state():
     """Initialize session state variables"""
@@ -11,16 +12,7 @@ def initialize_session_state():
 def reset_form_fields():
     """Clear all form fields and reset edit state"""
     st.session_state.edit_rn = None
-    for key in [
-        "referenceNumber", "name", "pic", "status", "cpoDate", "customerPoNo", 
-        "rfqDate", "vendorQuoteDate", "date", "quotationNumber", "quotationDate", 
-        "prfbackOrder", "details", "bofApproval", "bofNo", "forInvoice", 
-        "bofDate", "invoiceDateBilling", "receivedDateBilling", "invoiceNumberBilling", 
-        "receivedByBilling", "receivedByRequest", 
-        "refNo", "receivedDateRequest", "refDate", "rfpApproval", "rfpDate", 
-        "rfpNo", "epoNo", "invoiceAmount", "invoiceDate", "invoiceNo", 
-        "poDate", "sentByandDate", "supplierName"
-    ]:
+    for key in FIELD_NAMES:
         if key in st.session_state:
             del st.session_state[key]
 
@@ -72,51 +64,10 @@ def handle_form_management():
 
 def save_all_data():
     """Collect and return all form data for submission"""
-    all_data = {
-        "customerForm": {
-            "referenceNumber": st.session_state.get("referenceNumber", ""),
-            "name": st.session_state.get("name", ""),
-            "pic": st.session_state.get("pic", ""),
-            "status": st.session_state.get("status", ""),
-            "cpoDate": str(st.session_state.get("cpoDate", "")),
-            "customerPoNo": st.session_state.get("customerPoNo", ""),
-            "rfqDate": str(st.session_state.get("rfqDate", "")),
-            "vendorQuoteDate": str(st.session_state.get("vendorQuoteDate", "")),
-            "date": str(st.session_state.get("date", "")),
-            "quotationNumber": st.session_state.get("quotationNumber", ""),
-            "quotationDate": str(st.session_state.get("quotationDate", "")),
-            "prfbackOrder": st.session_state.get("prfbackOrder", ""),
-            "details": st.session_state.get("details", ""),
-        },
-        "billingOrderForm": {
-            "bofApproval": st.session_state.get("bofApproval", ""),
-            "bofNo": st.session_state.get("bofNo", ""),
-            "forInvoice": st.session_state.get("forInvoice", ""),
-            "bofDate": str(st.session_state.get("bofDate", "")),
-            "invoiceDateBilling": str(st.session_state.get("invoiceDateBilling", "")),
-            "receivedDateBilling": str(st.session_state.get("receivedDateBilling", "")),
-            "invoiceNumberBilling": st.session_state.get("invoiceNumberBilling", ""),
-            "receivedByBilling": st.session_state.get("receivedByBilling", ""),
-        },
-        "requestForPaymentForm": {
-            "receivedByRequest": st.session_state.get("receivedByRequest", ""),
-            "refNo": st.session_state.get("refNo", ""),
-            "receivedDateRequest": str(st.session_state.get("receivedDateRequest", "")),
-            "refDate": str(st.session_state.get("refDate", "")),
-            "rfpApproval": st.session_state.get("rfpApproval", ""),
-            "rfpDate": str(st.session_state.get("rfpDate", "")),
-            "rfpNo": st.session_state.get("rfpNo", ""),
-        },
-        "vendorForm": {
-            "epoNo": st.session_state.get("epoNo", ""),
-            "invoiceAmount": st.session_state.get("invoiceAmount", ""),
-            "invoiceDate": str(st.session_state.get("invoiceDate", "")),
-            "invoiceNo": st.session_state.get("invoiceNo", ""),
-            "poDate": str(st.session_state.get("poDate", "")),
-            "sentByandDate": st.session_state.get("sentByandDate", ""),
-            "supplierName": st.session_state.get("supplierName", ""),
-        }
-    }
+    all_data = {section: {} for section in SECTIONS}
+    for spec in FIELDS:
+        value = st.session_state.get(spec.name, "")
+        all_data[spec.section][spec.name] = str(value) if spec.is_date else value
     # Only clear the state of the keys in all_data
     for section in all_data.values():
         for key in section.keys():
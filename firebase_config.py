@@ -1,53 +1,103 @@
 # firebase_config.py
 import json
+import os
 import firebase_admin
 from firebase_admin import credentials, firestore, auth, storage, db as realtime_db
 import streamlit as st
 
-# Initialize Firebase services
-def initialize_firebase():
-    key_dict = json.loads(st.secrets["KEY"])
-    project_name = st.secrets["PROJECT_NAME"]
-    database_url = st.secrets["LINK"]
-    storage_bucket = st.secrets["BUCKET"]  # Should be "procurement-3745e.appspot.com"
-    
-    # Initialize Firebase app if not already initialized
-    if not firebase_admin._apps:
+
+def _backend_setting(name, default=None):
+    """SMARTSOURCING_<name> from the environment, else <name> from Streamlit secrets."""
+    value = os.environ.get(f"SMARTSOURCING_{name}")
+    if value is None:
+        try:
+            value = st.secrets.get(name)
+        except Exception:
+            value = None
+    return default if value is None else value
+
+
+def use_local_backend():
+    """True when BACKEND = "local": every service is served by local_backend, offline."""
+    return str(_backend_setting("BACKEND", "firebase")).lower() == "local"
+
+
+@st.cache_resource(show_spinner=False)
+def _local_backend():
+    """In-process stand-in, with LOCAL_LATENCY_MS per call and optional LOCAL_DB_PATH (SQLite)."""
+    from local_backend import LocalBackend
+    return LocalBackend(
+        latency=float(_backend_setting("LOCAL_LATENCY_MS", 0)) / 1000,
+        path=_backend_setting("LOCAL_DB_PATH"),
+    )
+
+
+# Each client is created lazily on first use and shared by every session
+# in the process, so a page only pays for the services it touches.
+@st.cache_resource(show_spinner=False)
+def _firebase_app():
+    """Initialize the Firebase Admin app from Streamlit secrets"""
+    if firebase_admin._apps:
+        return firebase_admin.get_app()
+    try:
+        key_dict = json.loads(st.secrets["KEY"])
+        database_url = st.secrets.get("LINK")
+        if not database_url:
+            raise ValueError("Database URL is missing in secrets")
+
+        options = {'databaseURL': database_url}
+        storage_bucket = st.secrets.get("BUCKET")  # Should be "procurement-3745e.appspot.com"
+        if storage_bucket:
+            options['storageBucket'] = storage_bucket
+
         cred = credentials.Certificate(key_dict)
-        firebase_app = firebase_admin.initialize_app(
-            cred,
-            {
-                'databaseURL': database_url,
-                'storageBucket': storage_bucket
-            }
-        )
-    
-    # Initialize individual services
-    firestore_db = firestore.client()
-    auth_client = auth
-    realtime_db_client = realtime_db
-    storage_client = storage.bucket(storage_bucket)  # Explicitly specify the bucket name
-    
-    return firestore_db, auth_client, realtime_db_client, storage_client
-
-try:
-    firestore_db, auth_client, realtime_db_client, storage_client = initialize_firebase()
-except ValueError as e:
-    st.error(f"Firebase initialization error: {e}")
-    raise
+        return firebase_admin.initialize_app(cred, options)
+    except json.JSONDecodeError:
+        st.error("Invalid service account JSON in secrets")
+        raise
+    except ValueError as e:
+        st.error(f"Firebase configuration error: {e}")
+        raise
+    except Exception as e:
+        st.error(f"Failed to initialize Firebase: {e}")
+        raise
+
+
+@st.cache_resource(show_spinner=False)
+def _firestore_client():
+    return firestore.client(app=_firebase_app())
+
+
+@st.cache_resource(show_spinner=False)
+def _storage_bucket():
+    return storage.bucket(app=_firebase_app())
+
 
 def get_firestore():
     """Return Firestore database instance"""
-    return firestore_db
+    if use_local_backend():
+        return _local_backend().firestore
+    return _firestore_client()
+
 
 def get_auth():
     """Return Firebase Auth instance"""
-    return auth_client
+    if use_local_backend():
+        return _local_backend().auth
+    _firebase_app()
+    return auth
+
 
 def get_realtime_db():
     """Return Realtime Database instance"""
-    return realtime_db_client
+    if use_local_backend():
+        return _local_backend().rtdb
+    _firebase_app()
+    return realtime_db
+
 
 def get_storage():
     """Return Cloud Storage bucket instance"""
-    return storage_client
\ No newline at end of file
+    if use_local_backend():
+        return _local_backend().storage
+    return _storage_bucket()
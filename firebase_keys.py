@@ -0,0 +1,9 @@
+# Characters Realtime Database keys cannot contain, and their replacements
+_KEY_TRANSLATION = str.maketrans({".": ",", "$": "_", "#": "_", "[": "_", "]": "_", "/": "_"})
+
+
+def index_key(value):
+    """Normalize a value into a valid, case-insensitive RTDB key ('' if not indexable)."""
+    if value is None:
+        return ""
+    return str(value).strip().lower().translate(_KEY_TRANSLATION)
@@ -1,9 +1,13 @@
 import streamlit as st
+import copy
 import datetime
 import api
 from data_management import save_all_data
-from firebase_config import get_firestore
-import pandas as pd
+from user_profiles import get_user_profile
+from record_schema import STATUSES
+
+# How close an existing name must be to be offered in place of a new one
+SIMILAR_NAME_SCORE = 0.5
 
 
 def safe_date_input(label, key, form_data, default=None):
@@ -25,19 +29,12 @@ def safe_date_input(label, key, form_data, default=None):
     return st.date_input(label, key=key, value=default)
 
 
-firestore_db = get_firestore()
-
-
 def update_reference_type():
     st.session_state.referenceType = st.session_state.referenceType_select
 
 
-# Load customer data from Excel
-customer_df = pd.read_excel('./pics/Customer Data.xlsx')
-customer_names = customer_df['CUSTOMER NAME'].dropna().unique().tolist()
-
-
 def deploy_forms(form_data):
+    form_type = st.session_state.get("referenceType") or "New Reference"
 
     latest_ref = api.get_latest_reference_number()
     aftersales_latest_ref = api.get_latest_aftersales_reference_number()
@@ -50,6 +47,8 @@ def deploy_forms(form_data):
         st.markdown("**:orange[Latest After Sales Ref]**")
         st.code(aftersales_latest_ref, language="text")
 
+    confirm_similar_names()
+
     """Render all form sections in a more compact, user-friendly layout."""
     with st.form("allForms", clear_on_submit=True, border=False, enter_to_submit=False):
         with st.expander("👤 Customer Details", expanded=True):
@@ -81,9 +80,8 @@ def deploy_forms(form_data):
                     placeholder="Enter details"
                 )
             with c4_r1:
-                user_ref = firestore_db.collection('users').document(
+                user_data = get_user_profile(
                     st.session_state.current_user['uid'])
-                user_data = user_ref.get().to_dict()
                 user_name = user_data.get('first_name')
                 st.text_input(
                     "Person in Charge (PIC)",
@@ -143,6 +141,8 @@ def deploy_forms(form_data):
                     st.session_state.name = final_customer_name
                 else:
                     # Use a selectbox with "All" as the default option, followed by customer names
+                    customer_index = api.get_name_index("customer", form_type, wait=False)
+                    customer_names = known_names("customer", form_type)
                     customer_options = ["All"] + customer_names
                     selected_name = st.selectbox(
                         "Customer Name",
@@ -157,14 +157,10 @@ def deploy_forms(form_data):
                         key="customer_name_input",
                         placeholder="Type new customer name"
                     )
-                    # Determine final customer name
-                    final_customer_name = new_name if new_name else selected_name
+                    # Determine final customer name, reusing the known spelling of a typed name
+                    final_customer_name = customer_index.canonical(new_name) if new_name else selected_name
                     st.session_state.name = final_customer_name
 
-                    # Add new name to customer_names if not present
-                    if new_name and new_name not in customer_names:
-                        customer_names.append(new_name)
-
             # Row 4: Customer PO No, CPO Date, Customer Status
             c1_r4, c2_r4, c3_r4 = st.columns(3)
             with c1_r4:
@@ -183,45 +179,9 @@ def deploy_forms(form_data):
             with c3_r4:
                 st.selectbox(
                     "Customer Status",
-                    options=[
-                        "Open",
-                        "QV",
-                        "QC",
-                        "POC",
-                        "POV",
-                        "DV",
-                        "DC",
-                        "BOF",
-                        "RFP",
-                        "Closed",
-                        "Cancelled"
-                    ],
-                    index=[
-                        "Open",
-                        "QV",
-                        "QC",
-                        "POC",
-                        "POV",
-                        "DV",
-                        "DC",
-                        "BOF",
-                        "RFP",
-                        "Closed",
-                        "Cancelled"
-                    ].index(form_data.get("customerForm", {}).get("status", "Open"))
-                    if form_data.get("customerForm", {}).get("status", "Open") in [
-                        "Open",
-                        "QV",
-                        "QC",
-                        "POC",
-                        "POV",
-                        "DV",
-                        "DC",
-                        "BOF",
-                        "RFP",
-                        "Closed",
-                        "Cancelled"
-                    ] else 0,
+                    options=STATUSES,
+                    index=STATUSES.index(form_data.get("customerForm", {}).get("status", "Open"))
+                    if form_data.get("customerForm", {}).get("status", "Open") in STATUSES else 0,
                     key="status",
                     placeholder="Select status"
                 )
@@ -244,13 +204,22 @@ def deploy_forms(form_data):
             # Row 2: Supplier Name, Sent By and Date
             v1_r2, v2_r2 = st.columns(2)
             with v1_r2:
-                st.text_input(
+                # Known suppliers filter as you type; a new name can still be entered
+                supplier_index = api.get_name_index("supplier", form_type, wait=False)
+                supplier_names = list(known_names("supplier", form_type))
+                current_supplier = form_data.get("vendorForm", {}).get("supplierName", "")
+                if current_supplier and current_supplier not in supplier_index:
+                    supplier_names.append(current_supplier)
+                selected_supplier = st.selectbox(
                     "Supplier Name",
-                    value=form_data.get("vendorForm", {}).get(
-                        "supplierName", ""),
-                    key="supplierName",
-                    placeholder="Enter supplier name"
+                    options=supplier_names,
+                    index=supplier_names.index(supplier_index.canonical(current_supplier))
+                    if current_supplier else None,
+                    key="supplier_name_select",
+                    placeholder="Select or enter supplier name",
+                    accept_new_options=True
                 )
+                st.session_state.supplierName = supplier_index.canonical(selected_supplier or "")
             with v2_r2:
                 st.text_input(
                     "Sent By and Date",
@@ -421,7 +390,84 @@ def handle_form_submission(type):
     print("Reference Type in Handle forms:", st.session_state.referenceType)
     form_type = st.session_state.referenceType
     all_data = save_all_data()
+    # Values are read; the next render lists names added since the form was opened
+    forget_known_names()
     customer_form = all_data.get("customerForm", {})
     reference_number = customer_form.get("referenceNumber", "unknown")
-    api.save_record(reference_number, all_data, form_type, type)
+    original = None
+    loaded = st.session_state.get("loaded_record")
+    if type.lower() == "edit" and loaded and loaded[:2] == (form_type, reference_number):
+        original = loaded[2]
+    similar = find_similar_names(all_data, form_type)
+    if similar:
+        # Saved once the user picks a spelling in confirm_similar_names
+        st.session_state.pending_save = (type, form_type, reference_number, all_data, original, similar)
+        return
+    api.save_record(reference_number, all_data, form_type, type, original=original)
+
+
+def known_names(kind, form_type):
+    """Names listed for kind, kept for the session until the form is next submitted.
+
+    A selectbox is identified by its options, so a list that grew between
+    render and submit (e.g. once the name index finished loading) would drop
+    the user's choice.
+    """
+    key = f"known_{kind}_names_{form_type}"
+    if key not in st.session_state:
+        st.session_state[key] = api.get_name_index(kind, form_type, wait=False).names()
+    return st.session_state[key]
+
+
+def forget_known_names():
+    for kind in api.NAME_FIELDS:
+        for form_type in api.RECORD_PATHS:
+            st.session_state.pop(f"known_{kind}_names_{form_type}", None)
+
+
+def find_similar_names(all_data, form_type):
+    """New customer/supplier names that look like known ones: {kind: (name, [known names])}."""
+    similar = {}
+    for kind, (section, field) in api.NAME_FIELDS.items():
+        name = (all_data.get(section) or {}).get(field) or ""
+        index = api.get_name_index(kind, form_type)
+        if name and name not in index:
+            known = index.suggest(name, k=3, min_score=SIMILAR_NAME_SCORE)
+            if known:
+                similar[kind] = (name, known)
+    return similar
+
+
+def confirm_similar_names():
+    """Ask whether a new customer/supplier name was meant to be a known one, then save."""
+    pending = st.session_state.get("pending_save")
+    if not pending:
+        return
+    type, form_type, reference_number, all_data, original, similar = pending
+    with st.container(border=True):
+        chosen = {}
+        for kind, (name, known) in similar.items():
+            chosen[kind] = st.radio(
+                f"**{name}** is a new {kind} name. Did you mean:",
+                options=known + [name],
+                format_func=lambda option, name=name: f"Keep \"{option}\" as a new name" if option == name else option,
+                key=f"similar_{kind}"
+            )
+        save_col, discard_col = st.columns(2)
+        if save_col.button("💾 Save", type="primary", use_container_width=True):
+            data = copy.deepcopy(all_data)
+            for kind, name in chosen.items():
+                section, field = api.NAME_FIELDS[kind]
+                data[section][field] = name
+            clear_pending_save()
+            api.save_record(reference_number, data, form_type, type, original=original)
+        if discard_col.button("Discard", use_container_width=True):
+            clear_pending_save()
+            st.rerun()
+
+
+def clear_pending_save():
+    st.session_state.pop("pending_save", None)
+    for kind in api.NAME_FIELDS:
+        st.session_state.pop(f"similar_{kind}", None)
     
\ No newline at end of file
@@ -0,0 +1,924 @@
+"""In-process stand-in for the Firebase services the app uses.
+
+Implements the subset of the firebase_admin Realtime Database, Firestore,
+Storage and Auth APIs that api.py, main.py and the pages call, with an
+optional per-call latency to mimic network round trips. State lives in memory
+and, when ``path`` is given, is written through to a SQLite file so it
+survives restarts. Selected in firebase_config with ``BACKEND = "local"``.
+"""
+import copy
+import datetime
+import enum
+import hashlib
+import json
+import os
+import pickle
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+try:
+    from google.cloud.firestore_v1 import SERVER_TIMESTAMP as _FIRESTORE_SERVER_TIMESTAMP
+except ImportError:
+    _FIRESTORE_SERVER_TIMESTAMP = object()
+
+
+class LocalBackend:
+    """Realtime Database, Firestore, Storage and Auth stand-ins sharing one store."""
+
+    def __init__(self, latency=0.0, jitter=0.0, path=None, storage_dir=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False) if path else None
+        if self._db is not None:
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS rtdb (top TEXT, child TEXT, value TEXT,
+                                                 PRIMARY KEY (top, child));
+                CREATE TABLE IF NOT EXISTS documents (collection TEXT, id TEXT, data BLOB,
+                                                      PRIMARY KEY (collection, id));
+                CREATE TABLE IF NOT EXISTS blobs (name TEXT PRIMARY KEY, content_type TEXT,
+                                                  data BLOB);
+            """)
+        if storage_dir is None and path:
+            storage_dir = os.path.join(os.path.dirname(os.path.abspath(path)), "local_storage")
+        self.rtdb = LocalRealtimeDatabase(self)
+        self.firestore = LocalFirestore(self)
+        self.storage = LocalBucket(self, "local-bucket", storage_dir)
+        self.auth = LocalAuth(self)
+        self.calls = 0
+        if self._db is not None:
+            self._load()
+
+    def round_trip(self):
+        """Count a call and sleep for the configured latency."""
+        self.calls += 1
+        if self.latency:
+            delay = self.latency
+            if self.jitter:
+                delay *= 1 + self._random.uniform(-self.jitter, self.jitter)
+            time.sleep(max(delay, 0))
+
+    # ------------------------ SQLite persistence ------------------------
+
+    def _load(self):
+        root = {}
+        for top, child, value in self._db.execute("SELECT top, child, value FROM rtdb"):
+            value = json.loads(value)
+            if child == "":
+                root[top] = value
+            else:
+                root.setdefault(top, {})[child] = value
+        self.rtdb._root = root
+        for collection, doc_id, data in self._db.execute("SELECT collection, id, data FROM documents"):
+            self.firestore._collections.setdefault(collection, {})[doc_id] = pickle.loads(data)
+        for name, content_type, data in self._db.execute("SELECT name, content_type, data FROM blobs"):
+            self.storage._blobs[name] = (bytes(data), content_type)
+
+    def _persist_rtdb(self, paths):
+        """Write the second-level RTDB nodes touched by writes at ``paths``."""
+        if self._db is None:
+            return
+        root = self.rtdb._root
+        rows, cleared = {}, set()
+        for segments in paths:
+            tops = list(root) + list(self._stored_tops()) if not segments else [segments[0]]
+            for top in tops:
+                node = root.get(top)
+                if len(segments) >= 2 and isinstance(node, dict):
+                    rows[(top, segments[1])] = node.get(segments[1])
+                    rows[(top, "")] = None
+                    continue
+                cleared.add(top)
+                if isinstance(node, dict):
+                    rows.update({(top, child): value for child, value in node.items()})
+                elif node is not None:
+                    rows[(top, "")] = node
+        with self._db:
+            for top in cleared:
+                self._db.execute("DELETE FROM rtdb WHERE top = ?", (top,))
+            for (top, child), value in rows.items():
+                self._db.execute("DELETE FROM rtdb WHERE top = ? AND child = ?", (top, child))
+                if value is not None:
+                    self._db.execute("INSERT INTO rtdb VALUES (?, ?, ?)", (top, child, json.dumps(value)))
+
+    def _stored_tops(self):
+        return (row[0] for row in self._db.execute("SELECT DISTINCT top FROM rtdb"))
+
+    def _persist_document(self, collection, doc_id, data):
+        if self._db is None:
+            return
+        with self._db:
+            self._db.execute("DELETE FROM documents WHERE collection = ? AND id = ?", (collection, doc_id))
+            if data is not None:
+                self._db.execute("INSERT INTO documents VALUES (?, ?, ?)",
+                                 (collection, doc_id, pickle.dumps(data)))
+
+    def _persist_blob(self, name, data, content_type):
+        if self._db is None:
+            return
+        with self._db:
+            self._db.execute("DELETE FROM blobs WHERE name = ?", (name,))
+            if data is not None:
+                self._db.execute("INSERT INTO blobs VALUES (?, ?, ?)", (name, content_type, data))
+
+
+# ------------------------ Realtime Database ------------------------
+
+def _split(path):
+    return [segment for segment in (path or "").split("/") if segment]
+
+
+def _resolve_server_values(value, now_ms):
+    if isinstance(value, dict):
+        if value == {".sv": "timestamp"}:
+            return now_ms
+        return {k: _resolve_server_values(v, now_ms) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_resolve_server_values(v, now_ms) for v in value]
+    return value
+
+
+def _prune(value):
+    """Drop nulls and empty objects, as RTDB never stores them."""
+    if isinstance(value, dict):
+        pruned = {str(k): _prune(v) for k, v in value.items()}
+        pruned = {k: v for k, v in pruned.items() if v is not None}
+        return pruned or None
+    if isinstance(value, (list, tuple)):
+        pruned = {str(i): _prune(v) for i, v in enumerate(value)}
+        pruned = {k: v for k, v in pruned.items() if v is not None}
+        return _as_array(pruned) if pruned else None
+    return value
+
+
+def _as_array(node):
+    # RTDB returns objects with mostly-dense integer keys as arrays
+    if not all(k.isdigit() for k in node):
+        return node
+    size = max(int(k) for k in node) + 1
+    if len(node) * 2 <= size:
+        return node
+    return [node.get(str(i)) for i in range(size)]
+
+
+_INT_KEY = re.compile(r"^-?[1-9]\d{0,9}$|^0$")
+
+
+def _key_rank(key):
+    if _INT_KEY.match(key) and -2 ** 31 <= int(key) < 2 ** 31:
+        return (0, int(key), "")
+    return (1, 0, key)
+
+
+def _value_rank(value):
+    if value is None:
+        return (0, 0, "")
+    if isinstance(value, bool):
+        return (1, int(value), "")
+    if isinstance(value, (int, float)):
+        return (2, value, "")
+    if isinstance(value, str):
+        return (3, 0, value)
+    return (4, 0, "")
+
+
+class LocalRealtimeDatabase:
+    """Stand-in for the ``firebase_admin.db`` module."""
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._root = {}
+
+    def reference(self, path="/"):
+        return LocalReference(self, _split(path))
+
+    # Internal helpers; callers hold backend._lock
+    def _get(self, segments):
+        node = self._root
+        for segment in segments:
+            if isinstance(node, list) and segment.isdigit() and int(segment) < len(node):
+                node = node[int(segment)]
+            elif isinstance(node, dict):
+                node = node.get(segment)
+            else:
+                return None
+            if node is None:
+                return None
+        return node
+
+    def _set(self, segments, value):
+        value = _prune(_resolve_server_values(value, int(time.time() * 1000)))
+        if not segments:
+            self._root = value if isinstance(value, dict) else {}
+            return
+        parents = [self._root]
+        node = self._root
+        for segment in segments[:-1]:
+            child = node.get(segment)
+            if isinstance(child, list):
+                child = {str(i): v for i, v in enumerate(child) if v is not None}
+                node[segment] = child
+            elif not isinstance(child, dict):
+                if value is None:
+                    return
+                child = {}
+                node[segment] = child
+            node = child
+            parents.append(node)
+        if value is None:
+            node.pop(segments[-1], None)
+        else:
+            node[segments[-1]] = value
+        # Remove parents left empty by a delete
+        for depth in range(len(parents) - 1, 0, -1):
+            if parents[depth]:
+                break
+            parents[depth - 1].pop(segments[depth - 1], None)
+
+
+class LocalReference:
+    """Stand-in for ``firebase_admin.db.Reference``."""
+
+    def __init__(self, database, segments):
+        self._database = database
+        self._backend = database._backend
+        self._segments = segments
+
+    @property
+    def key(self):
+        return self._segments[-1] if self._segments else None
+
+    @property
+    def path(self):
+        return "/" + "/".join(self._segments)
+
+    @property
+    def parent(self):
+        return LocalReference(self._database, self._segments[:-1]) if self._segments else None
+
+    def child(self, path):
+        return LocalReference(self._database, self._segments + _split(path))
+
+    def get(self, etag=False, shallow=False):
+        self._backend.round_trip()
+        with self._backend._lock:
+            value = copy.deepcopy(self._database._get(self._segments))
+        if shallow and isinstance(value, dict):
+            value = {k: True if isinstance(v, (dict, list)) else v for k, v in value.items()}
+        if etag:
+            return value, _etag(value)
+        return value
+
+    def set(self, value):
+        self._backend.round_trip()
+        with self._backend._lock:
+            self._database._set(self._segments, copy.deepcopy(value))
+            self._backend._persist_rtdb([self._segments])
+
+    def update(self, value):
+        if not isinstance(value, dict) or not value:
+            raise ValueError("Value argument must be a non-empty dictionary.")
+        self._backend.round_trip()
+        with self._backend._lock:
+            paths = []
+            for key, child_value in value.items():
+                segments = self._segments + _split(key)
+                self._database._set(segments, copy.deepcopy(child_value))
+                paths.append(segments)
+            self._backend._persist_rtdb(paths)
+
+    def push(self, value=""):
+        child = self.child(uuid.uuid4().hex[:20])
+        child.set(value)
+        return child
+
+    def delete(self):
+        self.set(None)
+
+    def transaction(self, transaction_update):
+        """Run ``transaction_update(current)`` atomically; exceptions abort it."""
+        self._backend.round_trip()
+        with self._backend._lock:
+            current = copy.deepcopy(self._database._get(self._segments))
+            new_value = transaction_update(current)
+            self._database._set(self._segments, copy.deepcopy(new_value))
+            self._backend._persist_rtdb([self._segments])
+            return copy.deepcopy(self._database._get(self._segments))
+
+    def order_by_key(self):
+        return LocalQuery(self, "key")
+
+    def order_by_value(self):
+        return LocalQuery(self, "value")
+
+    def order_by_child(self, path):
+        return LocalQuery(self, "child", _split(path))
+
+
+def _etag(value):
+    return hashlib.md5(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+class LocalQuery:
+    """Stand-in for ``firebase_admin.db.Query``."""
+
+    def __init__(self, reference, order_by, child_path=None):
+        self._reference = reference
+        self._order_by = order_by
+        self._child_path = child_path or []
+        self._start = self._end = None
+        self._has_start = self._has_end = False
+        self._first = self._last = None
+
+    def start_at(self, start):
+        self._start, self._has_start = start, True
+        return self
+
+    def end_at(self, end):
+        self._end, self._has_end = end, True
+        return self
+
+    def equal_to(self, value):
+        return self.start_at(value).end_at(value)
+
+    def limit_to_first(self, limit):
+        self._first = limit
+        return self
+
+    def limit_to_last(self, limit):
+        self._last = limit
+        return self
+
+    def _rank(self, key, value):
+        # Sorted by (ordered value, key); start_at/end_at compare the ordered value only
+        if self._order_by == "key":
+            return _key_rank(key)
+        if self._order_by == "child":
+            for segment in self._child_path:
+                value = value.get(segment) if isinstance(value, dict) else None
+        return _value_rank(value) + _key_rank(key)
+
+    def _bound(self, bound):
+        return _key_rank(str(bound)) if self._order_by == "key" else _value_rank(bound)
+
+    def get(self):
+        node = self._reference.get()
+        if isinstance(node, list):
+            node = {str(i): v for i, v in enumerate(node) if v is not None}
+        if not isinstance(node, dict):
+            return {}
+        ranked = sorted((self._rank(k, v), k) for k, v in node.items())
+        if self._has_start:
+            low = self._bound(self._start)
+            ranked = [item for item in ranked if item[0][:3] >= low]
+        if self._has_end:
+            high = self._bound(self._end)
+            ranked = [item for item in ranked if item[0][:3] <= high]
+        if self._first is not None:
+            ranked = ranked[:self._first]
+        if self._last is not None:
+            ranked = ranked[-self._last:] if self._last else []
+        return {k: node[k] for _, k in ranked}
+
+
+# ------------------------ Firestore ------------------------
+
+class NotFound(Exception):
+    """Raised by ``update`` on a missing document, like google.api_core's NotFound."""
+
+
+def _firestore_value(value, now):
+    if value is _FIRESTORE_SERVER_TIMESTAMP:
+        return now
+    if isinstance(value, datetime.datetime) and value.tzinfo is None:
+        # Firestore stores naive datetimes as UTC and returns them timezone-aware
+        return value.replace(tzinfo=datetime.timezone.utc)
+    if isinstance(value, dict):
+        return {k: _firestore_value(v, now) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_firestore_value(v, now) for v in value]
+    return value
+
+
+def _field(data, path):
+    for part in path.split("."):
+        if not isinstance(data, dict) or part not in data:
+            return None
+        data = data[part]
+    return data
+
+
+def _order_value(item, path):
+    doc_id, data = item
+    return doc_id if path == "__name__" else _field(data, path)
+
+
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+    "not-in": lambda a, b: a not in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+    "array_contains_any": lambda a, b: isinstance(a, list) and any(v in a for v in b),
+}
+
+
+class LocalFirestore:
+    """Stand-in for ``google.cloud.firestore.Client``."""
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._collections = {}
+        self._listeners = {}
+
+    def collection(self, name):
+        return LocalCollection(self, name)
+
+    def batch(self):
+        return LocalWriteBatch(self)
+
+    # Internal helpers; callers hold backend._lock
+    def _write(self, collection, doc_id, data, merge=False):
+        docs = self._collections.setdefault(collection, {})
+        data = _firestore_value(copy.deepcopy(data), datetime.datetime.now(datetime.timezone.utc))
+        if merge and doc_id in docs:
+            merged = docs[doc_id]
+            for key, value in data.items():
+                merged[key] = value
+            data = merged
+        docs[doc_id] = data
+        self._backend._persist_document(collection, doc_id, data)
+        self._notify(collection, doc_id)
+
+    def _update(self, collection, doc_id, data):
+        docs = self._collections.get(collection, {})
+        if doc_id not in docs:
+            raise NotFound(f"No document to update: {collection}/{doc_id}")
+        now = datetime.datetime.now(datetime.timezone.utc)
+        document = docs[doc_id]
+        for path, value in data.items():
+            parts = path.split(".")
+            node = document
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            node[parts[-1]] = _firestore_value(copy.deepcopy(value), now)
+        self._backend._persist_document(collection, doc_id, document)
+        self._notify(collection, doc_id)
+
+    def _delete(self, collection, doc_id):
+        self._collections.get(collection, {}).pop(doc_id, None)
+        self._backend._persist_document(collection, doc_id, None)
+        self._notify(collection, doc_id)
+
+    def _notify(self, collection, doc_id):
+        for watch in self._listeners.get(collection, ()):
+            watch._changed(doc_id)
+
+
+class LocalDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path):
+        """Like Firestore: None for a missing document, KeyError for a missing field."""
+        if self._data is None:
+            return None
+        node = self._data
+        for part in field_path.split("."):
+            if not isinstance(node, dict) or part not in node:
+                raise KeyError(f"'{field_path}' is not contained in the data")
+            node = node[part]
+        return copy.deepcopy(node)
+
+
+class LocalDocumentReference:
+    def __init__(self, firestore, collection, doc_id):
+        self._firestore = firestore
+        self._backend = firestore._backend
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f"{self._collection}/{self.id}"
+
+    def get(self):
+        self._backend.round_trip()
+        with self._backend._lock:
+            data = self._firestore._collections.get(self._collection, {}).get(self.id)
+            return LocalDocumentSnapshot(self, copy.deepcopy(data))
+
+    def set(self, document_data, merge=False):
+        self._backend.round_trip()
+        with self._backend._lock:
+            self._firestore._write(self._collection, self.id, document_data, merge)
+
+    def update(self, field_updates):
+        self._backend.round_trip()
+        with self._backend._lock:
+            self._firestore._update(self._collection, self.id, field_updates)
+
+    def delete(self):
+        self._backend.round_trip()
+        with self._backend._lock:
+            self._firestore._delete(self._collection, self.id)
+
+
+class LocalQueryBase:
+    """Filter/order/cursor/limit chain shared by collections and queries."""
+
+    def __init__(self, firestore, collection, filters=(), orders=(), limit=None, cursor=None):
+        self._firestore = firestore
+        self._backend = firestore._backend
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._cursor = cursor
+
+    def _query(self, **changes):
+        state = dict(filters=self._filters, orders=self._orders, limit=self._limit,
+                     cursor=self._cursor)
+        state.update(changes)
+        return LocalCollectionQuery(self._firestore, self._collection, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._query(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return self._query(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._query(limit=count)
+
+    def start_after(self, document_fields_or_snapshot):
+        """Resume after a document snapshot or a {field: value} dict of the order_by fields."""
+        cursor = document_fields_or_snapshot
+        if isinstance(cursor, LocalDocumentSnapshot):
+            cursor = {path: cursor.id if path == "__name__" else cursor.get(path)
+                      for path, _ in self._orders}
+        return self._query(cursor=dict(cursor))
+
+    def _matches(self):
+        with self._backend._lock:
+            docs = self._firestore._collections.get(self._collection, {})
+            items = [(doc_id, data) for doc_id, data in docs.items()
+                     if all(_OPERATORS[op](_field(data, path), value)
+                            for path, op, value in self._filters)]
+        # Like Firestore, documents without an order_by field are left out
+        for path, direction in reversed(self._orders):
+            items = [item for item in items if _order_value(item, path) is not None]
+            items.sort(key=lambda item: _order_value(item, path),
+                       reverse=str(direction).upper().startswith("DESC"))
+        if self._cursor is not None:
+            items = [item for item in items if self._after_cursor(item)]
+        if self._limit is not None:
+            items = items[:self._limit]
+        with self._backend._lock:
+            return [(doc_id, copy.deepcopy(data)) for doc_id, data in items]
+
+    def _after_cursor(self, item):
+        for path, direction in self._orders:
+            value, bound = _order_value(item, path), self._cursor.get(path)
+            if value != bound:
+                return (value < bound) == str(direction).upper().startswith("DESC")
+        return False
+
+    def on_snapshot(self, callback):
+        """Call ``callback(docs, changes, read_time)`` now and after every change; see LocalWatch."""
+        return LocalWatch(self, callback)
+
+    def stream(self):
+        self._backend.round_trip()
+        for doc_id, data in self._matches():
+            yield LocalDocumentSnapshot(
+                LocalDocumentReference(self._firestore, self._collection, doc_id), data)
+
+    def get(self):
+        return list(self.stream())
+
+
+class LocalCollection(LocalQueryBase):
+    def __init__(self, firestore, name):
+        super().__init__(firestore, name)
+        self.id = name
+
+    def document(self, document_id=None):
+        return LocalDocumentReference(self._firestore, self._collection,
+                                      document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data, document_id=None):
+        reference = self.document(document_id)
+        reference.set(document_data)
+        return datetime.datetime.now(datetime.timezone.utc), reference
+
+
+class LocalCollectionQuery(LocalQueryBase):
+    pass
+
+
+class ChangeType(enum.Enum):
+    """Same members as google.cloud.firestore_v1.watch.ChangeType."""
+    ADDED = 1
+    REMOVED = 2
+    MODIFIED = 3
+
+
+class LocalDocumentChange:
+    def __init__(self, type, document):
+        self.type = type
+        self.document = document
+        self.old_index = -1
+        self.new_index = -1
+
+
+class LocalWatch:
+    """Snapshot listener on a collection or query, like firestore's ``Watch``.
+
+    Callbacks run on the listener's own thread, first with every matching
+    document as ADDED and then with the changes since the previous call;
+    changes that arrive while a callback runs are delivered together. Order
+    and limit only apply to the ``docs`` list, not to which changes are sent.
+    """
+
+    def __init__(self, query, callback):
+        self._query = query
+        self._callback = callback
+        self._firestore = query._firestore
+        self._backend = query._backend
+        self._condition = threading.Condition()
+        self._changed_ids = set()
+        self._known = set()
+        self._initial = True
+        self._closed = False
+        self._backend.round_trip()
+        with self._backend._lock:
+            self._firestore._listeners.setdefault(query._collection, []).append(self)
+            self._changed_ids.update(self._firestore._collections.get(query._collection, {}))
+        self._thread = threading.Thread(target=self._run, name="local-firestore-watch", daemon=True)
+        self._thread.start()
+
+    @property
+    def is_active(self):
+        return not self._closed
+
+    def unsubscribe(self):
+        with self._backend._lock:
+            listeners = self._firestore._listeners.get(self._query._collection, [])
+            if self in listeners:
+                listeners.remove(self)
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def _changed(self, doc_id):
+        with self._condition:
+            self._changed_ids.add(doc_id)
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not (self._changed_ids or self._initial or self._closed):
+                    self._condition.wait()
+                if self._closed:
+                    return
+                changed_ids, self._changed_ids = self._changed_ids, set()
+            changes = self._changes(changed_ids)
+            if changes or self._initial:
+                self._initial = False
+                docs = [LocalDocumentSnapshot(self._reference(doc_id), data)
+                        for doc_id, data in self._query._matches()]
+                try:
+                    self._callback(docs, changes, datetime.datetime.now(datetime.timezone.utc))
+                except Exception as e:
+                    print(f"Snapshot listener callback failed: {e}")
+
+    def _changes(self, doc_ids):
+        changes = []
+        with self._backend._lock:
+            docs = self._firestore._collections.get(self._query._collection, {})
+            for doc_id in sorted(doc_ids):
+                data = docs.get(doc_id)
+                matches = data is not None and all(
+                    _OPERATORS[op](_field(data, path), value)
+                    for path, op, value in self._query._filters)
+                if matches:
+                    kind = ChangeType.MODIFIED if doc_id in self._known else ChangeType.ADDED
+                    self._known.add(doc_id)
+                elif doc_id in self._known:
+                    kind, data = ChangeType.REMOVED, None
+                    self._known.discard(doc_id)
+                else:
+                    continue
+                snapshot = LocalDocumentSnapshot(self._reference(doc_id), copy.deepcopy(data))
+                changes.append(LocalDocumentChange(kind, snapshot))
+        return changes
+
+    def _reference(self, doc_id):
+        return LocalDocumentReference(self._firestore, self._query._collection, doc_id)
+
+
+class LocalWriteBatch:
+    """Collects writes and applies them together in one round trip on commit()."""
+
+    def __init__(self, firestore):
+        self._firestore = firestore
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(("set", reference, document_data, merge))
+
+    def update(self, reference, field_updates):
+        self._writes.append(("update", reference, field_updates, False))
+
+    def delete(self, reference):
+        self._writes.append(("delete", reference, None, False))
+
+    def commit(self):
+        backend = self._firestore._backend
+        backend.round_trip()
+        with backend._lock:
+            for kind, reference, data, merge in self._writes:
+                if kind == "set":
+                    self._firestore._write(reference._collection, reference.id, data, merge)
+                elif kind == "update":
+                    self._firestore._update(reference._collection, reference.id, data)
+                else:
+                    self._firestore._delete(reference._collection, reference.id)
+        written, self._writes = len(self._writes), []
+        return written
+
+
+# ------------------------ Storage ------------------------
+
+class LocalBucket:
+    """Stand-in for ``google.cloud.storage.Bucket``; files are mirrored to ``directory``."""
+
+    def __init__(self, backend, name, directory=None):
+        self._backend = backend
+        self.name = name
+        self._directory = directory
+        self._blobs = {}
+
+    def blob(self, blob_name):
+        return LocalBlob(self, blob_name)
+
+    def get_blob(self, blob_name):
+        blob = LocalBlob(self, blob_name)
+        return blob if blob.exists() else None
+
+    def _file_path(self, blob_name):
+        return os.path.join(self._directory, *_split(blob_name)) if self._directory else None
+
+
+class LocalBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_type = None
+        self.cache_control = None
+        self.metadata = None
+
+    @property
+    def _backend(self):
+        return self.bucket._backend
+
+    def upload_from_string(self, data, content_type="text/plain"):
+        if isinstance(data, str):
+            data = data.encode()
+        self._backend.round_trip()
+        with self._backend._lock:
+            self.bucket._blobs[self.name] = (bytes(data), content_type)
+            self.content_type = content_type
+            self._backend._persist_blob(self.name, bytes(data), content_type)
+        file_path = self.bucket._file_path(self.name)
+        if file_path:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.write(data)
+
+    def download_as_bytes(self):
+        self._backend.round_trip()
+        with self._backend._lock:
+            if self.name not in self.bucket._blobs:
+                raise NotFound(f"No such object: {self.bucket.name}/{self.name}")
+            return self.bucket._blobs[self.name][0]
+
+    def exists(self):
+        self._backend.round_trip()
+        with self._backend._lock:
+            return self.name in self.bucket._blobs
+
+    def reload(self):
+        self._backend.round_trip()
+
+    def patch(self):
+        self._backend.round_trip()
+
+    def make_public(self):
+        self._backend.round_trip()
+
+    def delete(self):
+        self._backend.round_trip()
+        with self._backend._lock:
+            self.bucket._blobs.pop(self.name, None)
+            self._backend._persist_blob(self.name, None, None)
+        file_path = self.bucket._file_path(self.name)
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+
+    @property
+    def size(self):
+        entry = self.bucket._blobs.get(self.name)
+        return len(entry[0]) if entry else None
+
+    @property
+    def etag(self):
+        entry = self.bucket._blobs.get(self.name)
+        return hashlib.md5(entry[0]).hexdigest() if entry else None
+
+    @property
+    def public_url(self):
+        # A mirrored file path works wherever the app accepts local image paths
+        return self.bucket._file_path(self.name) or f"local://{self.bucket.name}/{self.name}"
+
+
+# ------------------------ Auth ------------------------
+
+class LocalUserRecord:
+    def __init__(self, uid, email, display_name=None, email_verified=True, disabled=False):
+        self.uid = uid
+        self.email = email
+        self.display_name = display_name
+        self.email_verified = email_verified
+        self.disabled = disabled
+
+
+class LocalAuth:
+    """Stand-in for the ``firebase_admin.auth`` functions main.py calls.
+
+    Users are kept in the reserved ``_auth_users`` Firestore collection and
+    count as verified, since no email can be sent offline.
+    """
+    COLLECTION = "_auth_users"
+
+    class UserNotFoundError(Exception):
+        pass
+
+    class EmailAlreadyExistsError(Exception):
+        pass
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def _users(self):
+        return self._backend.firestore.collection(self.COLLECTION)
+
+    def create_user(self, email=None, password=None, display_name=None, **kwargs):
+        with self._backend._lock:
+            if any(True for _ in self._users().where("email", "==", email).stream()):
+                raise self.EmailAlreadyExistsError(f"User with email {email} already exists")
+            uid = uuid.uuid4().hex[:28]
+            self._users().document(uid).set({
+                "email": email, "display_name": display_name, "email_verified": True,
+            })
+        return LocalUserRecord(uid, email, display_name)
+
+    def get_user(self, uid):
+        snapshot = self._users().document(uid).get()
+        if not snapshot.exists:
+            raise self.UserNotFoundError(f"No user record found for uid {uid}")
+        data = snapshot.to_dict()
+        return LocalUserRecord(uid, data["email"], data.get("display_name"),
+                               data.get("email_verified", True))
+
+    def get_user_by_email(self, email):
+        for snapshot in self._users().where("email", "==", email).stream():
+            data = snapshot.to_dict()
+            return LocalUserRecord(snapshot.id, email, data.get("display_name"),
+                                   data.get("email_verified", True))
+        raise self.UserNotFoundError(f"No user record found for email {email}")
+
+    def generate_email_verification_link(self, email, action_code_settings=None):
+        return f"http://localhost/verify?email={email}"
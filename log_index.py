@@ -0,0 +1,65 @@
+from firebase_keys import index_key
+
+INDEX_ROOT = "log_index"
+
+# index name -> how to read the indexed value from a log entry
+INDEXED_FIELDS = {
+    "by_ref": lambda entry: entry.get("referenceNumber"),
+    "by_user": lambda entry: entry.get("user", {}).get("email"),
+    "by_name": lambda entry: entry.get("user", {}).get("displayName"),
+    "by_pic": lambda entry: log_pic(entry),
+    "by_action": lambda entry: entry.get("action"),
+}
+
+
+def log_pic(entry):
+    """PIC recorded on a log entry."""
+    changed = entry.get("changedDetails") or {}
+    return entry.get("pic") or (changed.get("customerForm") or {}).get("pic", "")
+
+
+def log_summary(entry):
+    """Small copy of a log entry stored under each index node."""
+    return {
+        "action": entry.get("action", ""),
+        "pic": log_pic(entry),
+        "referenceNumber": entry.get("referenceNumber", ""),
+        "timestamp": entry.get("timestamp", ""),
+        "user": entry.get("user", {}).get("displayName", ""),
+    }
+
+
+def index_paths(log_id, entry):
+    """Multi-path update entries that add one log to every secondary index."""
+    summary = log_summary(entry)
+    paths = {}
+    for index_name, read in INDEXED_FIELDS.items():
+        key = index_key(read(entry))
+        if key:
+            paths[f"{INDEX_ROOT}/{index_name}/{key}/{log_id}"] = summary
+    return paths
+
+
+def search(rtdb, query, indexes=None, prefix=True, limit=200):
+    """Return {log_id: summary} for logs whose indexed values equal or start with ``query``.
+
+    Each index is answered by a single key-range query, so the cost depends on
+    the number of matches rather than the size of /logs. At most ``limit``
+    logs are returned, the newest first; a prefix query also reads at most
+    ``limit`` matching keys per index, each of which holds at least one log.
+    """
+    key = index_key(query)
+    if not key:
+        return {}
+    results = {}
+    for index_name in indexes or INDEXED_FIELDS:
+        ref = rtdb.reference(f"/{INDEX_ROOT}/{index_name}")
+        if prefix:
+            matches = ref.order_by_key().start_at(key).end_at(
+                key + "\uf8ff").limit_to_first(limit).get() or {}
+        else:
+            matches = {key: ref.child(key).get() or {}}
+        for logs in matches.values():
+            results.update(logs or {})
+    # Log ids are %Y%m%d%H%M%S%f timestamps, so they sort in creation order
+    return dict(sorted(results.items(), reverse=True)[:limit])
@@ -2,15 +2,16 @@ import datetime
 import uuid
 import streamlit as st
 # Then other imports
-from firebase_config import get_firestore, get_auth, get_realtime_db, get_storage
+from firebase_config import get_firestore, get_auth, get_storage
+from user_profiles import get_user_profile, invalidate_user_profile
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from firebase_admin import auth
 from firebase_admin.exceptions import FirebaseError
+from firebase_admin.firestore import SERVER_TIMESTAMP
 # from firebase_admin import firestore  # Removed unused import
-from PIL import Image
-import io
+from avatars import AVATAR_MIME, RENDITION_SIZES, make_renditions
 import uuid
 import datetime
 
@@ -21,13 +22,11 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize Firebase services
-# Get services
-db = get_firestore()
+# Get services (created lazily and shared across sessions)
 auth = get_auth()
-rtdb = get_realtime_db()
-storage_client = get_storage()
 firestore_db = get_firestore()
+# Largest profile picture accepted at signup
+MAX_PROFILE_PIC_BYTES = 10 * 1024 * 1024
 # Initialize session state
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
@@ -66,10 +65,10 @@ def signup(email, password, user_data):
             email_verified=False
         )
 
-        # Upload profile picture if provided
-        profile_pic_url = ""
+        # Upload profile picture renditions if provided
+        renditions = {}
         if user_data.get('profile_pic'):
-            profile_pic_url = upload_profile_picture(
+            renditions = upload_profile_picture(
                 user.uid, user_data['profile_pic'])
 
         # Create user document in Firestore
@@ -89,14 +88,17 @@ def signup(email, password, user_data):
                 'zip_code': user_data.get('zip_code', ''),
                 'country': user_data.get('country', '')
             },
-            'profile_pic_url': profile_pic_url,
+            'profile_pic_url': renditions.get(str(max(RENDITION_SIZES)), ""),
+            'profile_pic_renditions': renditions,
             'skills': user_data.get('skills', []),
-            'bio': user_data.get('bio', '')
+            'bio': user_data.get('bio', ''),
+            'updated_at': SERVER_TIMESTAMP
         }
         # Show a loader while processing
         with st.spinner("Creating your account..."):
             # Save to Firestore
             firestore_db.collection('users').document(user.uid).set(user_doc)
+            invalidate_user_profile(user.uid)
 
             # Send verification email
             link = auth.generate_email_verification_link(email)
@@ -114,29 +116,30 @@ def signup(email, password, user_data):
 
 
 def upload_profile_picture(user_id, image_file):
+    """Upload square WebP renditions of a profile picture; returns {"<size>": url}."""
     try:
-        # Generate unique filename
-        filename = f"profile_pics/{user_id}/{uuid.uuid4()}.jpg"
-
-        # Create blob in Firebase Storage
-        blob = storage_client.blob(filename)
-
-        # Process image
-        img = Image.open(image_file)
-        img_byte_arr = io.BytesIO()
-        img.save(img_byte_arr, format='JPEG')
-        img_byte_arr = img_byte_arr.getvalue()
-
-        # Upload to Firebase Storage
-        blob.upload_from_string(img_byte_arr, content_type='image/jpeg')
-
-        # Get download URL
-        blob.make_public()
-        return blob.public_url
+        data = image_file.getvalue()
+        if len(data) > MAX_PROFILE_PIC_BYTES:
+            st.error(f"Profile picture is too large (max {MAX_PROFILE_PIC_BYTES // (1024 * 1024)} MB)")
+            return {}
+
+        # EXIF-oriented, metadata-free renditions; the original is not kept
+        renditions = make_renditions(data)
+
+        # Every upload gets a new name, so the files can be cached for good
+        upload_id = uuid.uuid4()
+        urls = {}
+        for size, rendition in renditions.items():
+            blob = get_storage().blob(f"profile_pics/{user_id}/{upload_id}_{size}.webp")
+            blob.cache_control = 'public, max-age=31536000, immutable'
+            blob.upload_from_string(rendition, content_type=AVATAR_MIME)
+            blob.make_public()
+            urls[str(size)] = blob.public_url
+        return urls
 
     except Exception as e:
         st.error(f"Error uploading profile picture: {e}")
-        return ""
+        return {}
 
 
 def send_verification_email(email, verification_link):
@@ -199,13 +202,13 @@ if st.session_state.logged_in:
 
     if st.session_state.logged_in:
         # Display user profile if available
-        user_ref = firestore_db.collection('users').document(st.session_state.current_user['uid'])
-        user_data = user_ref.get().to_dict()
+        user_data = get_user_profile(st.session_state.current_user['uid'])
 
         pages = {
             "📝 Tasks": [
                 st.Page("pages/Home.py", title="🏠 Home"),
                 st.Page("pages/View Tables.py", title="📊 View Tables"),
+                st.Page("pages/Import.py", title="📥 Import Records"),
             ],
             "🛠️ Utilities": [
                 st.Page("pages/Logs.py", title="📜 Logs"),
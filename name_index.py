@@ -0,0 +1,112 @@
+import bisect
+import math
+import re
+import threading
+from collections import Counter
+
+# Punctuation is ignored when comparing names, so "ABC Corp." and "abc corp" are one entry
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_name(name):
+    """Comparison key for a name: lowercase, punctuation dropped, whitespace collapsed."""
+    return " ".join(_NON_WORD.sub(" ", str(name).lower()).split())
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Typeahead index over a set of names: prefix matches first, then trigram similarity.
+
+    Names are deduplicated on ``normalize_name``; the first spelling added is the
+    one returned, so load the canonical list (e.g. the customer workbook) first.
+    """
+
+    def __init__(self, names=()):
+        self._lock = threading.Lock()
+        self._display = {}
+        self._keys = []
+        self._grams = {}
+        self._postings = {}
+        # Record-store versions already folded in, per form type
+        self.source_versions = {}
+        self.update(names)
+
+    def __len__(self):
+        return len(self._display)
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._display
+
+    def names(self):
+        """Every distinct name, in normalized alphabetical order."""
+        return [self._display[key] for key in self._keys]
+
+    def canonical(self, name):
+        """The indexed spelling of ``name`` if another spelling of it is known, else ``name``."""
+        if not isinstance(name, str):
+            return name
+        return self._display.get(normalize_name(name), name)
+
+    def add(self, name):
+        """Add one name; returns False if it (or another spelling of it) is already indexed."""
+        if not isinstance(name, str) or not name.strip():
+            return False
+        key = normalize_name(name)
+        if not key:
+            return False
+        with self._lock:
+            if key in self._display:
+                return False
+            self._display[key] = name.strip()
+            bisect.insort(self._keys, key)
+            grams = _trigrams(key)
+            self._grams[key] = len(grams)
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(key)
+            return True
+
+    def update(self, names):
+        """Add many names; returns how many were new."""
+        return sum(self.add(name) for name in names)
+
+    def suggest(self, query, k=10, min_score=0.35):
+        """Up to ``k`` indexed names for ``query``: prefix matches, then closest by trigram overlap."""
+        key = normalize_name(query or "")
+        if not key:
+            return []
+        with self._lock:
+            start = bisect.bisect_left(self._keys, key)
+            end = bisect.bisect_right(self._keys, key + "\uffff")
+            prefix = self._keys[start:min(end, start + k)]
+            results = [self._display[match] for match in prefix]
+            if len(results) >= k:
+                return results
+
+            grams = _trigrams(key)
+            # Trigrams shared by many names (e.g. " in", "inc") are not counted
+            # name by name; they are only checked for names that are otherwise close.
+            limit = max(64, len(self._keys) // 50)
+            postings = [self._postings.get(gram, set()) for gram in grams]
+            common = [posting for posting in postings if len(posting) > limit]
+            overlap = Counter()
+            for posting in postings:
+                if len(posting) <= limit:
+                    overlap.update(posting)
+            # Jaccard >= min_score needs at least this many shared trigrams
+            needed = math.ceil(min_score * len(grams)) - len(common)
+            seen = set(prefix)
+            scored = []
+            for match, shared in overlap.items():
+                if shared < needed or match in seen:
+                    continue
+                shared += sum(match in posting for posting in common)
+                score = shared / (len(grams) + self._grams[match] - shared)
+                if score >= min_score:
+                    scored.append((-score, match))
+            scored.sort()
+            results.extend(self._display[match] for _, match in scored[:k - len(results)])
+            return results
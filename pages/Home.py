@@ -12,39 +12,15 @@ def initialize_session_state():
         st.session_state.forms = {}
 
 
-def convert_dates_in_record(record):
-    if isinstance(record, dict):
-        for k, v in record.items():
-            if isinstance(v, str):
-                try:
-                    parsed = datetime.fromisoformat(v)
-                    if parsed.time() == datetime.min.time():
-                        record[k] = parsed.date()
-                    else:
-                        record[k] = parsed
-                except Exception:
-                    pass
-            elif isinstance(v, dict):
-                convert_dates_in_record(v)
-            elif isinstance(v, list):
-                for i, item in enumerate(v):
-                    if isinstance(item, dict):
-                        convert_dates_in_record(item)
-    return record
-
-
 def handle_existing_record(reference_number, reference_type, editable=True):
-    if reference_type == "After Sales":
-        records = api.get_records(form_type="After Sales")
-    else:
-        records = api.get_records(form_type="New Reference")
-
-    record = records.get(reference_number)
+    record = api.get_record(reference_number, form_type=reference_type)
 
     if record:
         st.info(f"Record found for Reference Number: {reference_number}")
         if editable:
-            record = convert_dates_in_record(record)
+            # The edit is saved as a diff against the record as loaded here
+            st.session_state.loaded_record = (reference_type, reference_number, record)
+            # api.get_record already returns date fields as date objects
             deploy_forms(record)
         return True
     elif reference_number is None or reference_number == "":
@@ -101,8 +77,7 @@ def show_home():
     elif st.session_state.form_mode == "delete":
         reference_number = st.text_input("Enter Reference Number to Delete:").upper()
         if reference_number:
-            records = api.get_records(form_type=reference_type)
-            if reference_number in records:
+            if api.get_record(reference_number, form_type=reference_type):
                 if st.button("❌ Confirm Delete"):
                     api.delete_record(reference_number,reference_type)
                     st.success("Record deleted.")
@@ -0,0 +1,66 @@
+import pandas as pd
+import streamlit as st
+
+import api
+import bulk_import
+from record_schema import COLUMN_LABELS
+
+
+def show_summary(summary):
+    st.success(
+        f"Imported **{summary['imported']}** records, skipped **{summary['skipped']}** "
+        f"existing references, **{summary['errorCount']}** rows with errors."
+    )
+    if summary["unknownColumns"]:
+        st.warning("Ignored columns: " + ", ".join(summary["unknownColumns"]))
+    if summary["errors"]:
+        st.dataframe(
+            pd.DataFrame(summary["errors"], columns=["Row", "Ref No", "Error"]).head(500),
+            hide_index=True, use_container_width=True
+        )
+
+
+def main():
+    st.title("📥 Import Records")
+    st.markdown(
+        "Upload an XLSX or CSV file with one record per row. Column headers can be "
+        "the View Tables column names (e.g. *Ref No*, *Customer Name*) or field names; "
+        "dates must be YYYY-MM-DD and Status one of the form's statuses (blank is *Open*). "
+        "Existing reference numbers are skipped."
+    )
+
+    with st.expander("Recognized columns"):
+        st.write(", ".join(COLUMN_LABELS.values()))
+
+    form_type = st.selectbox("**Reference Type**", options=list(api.RECORD_PATHS))
+    upload = st.file_uploader("File", type=list(bulk_import.IMPORT_FORMATS))
+    if upload is None:
+        return
+
+    content = upload.getvalue()
+    job_id = bulk_import.import_id(content, form_type)
+    checkpoint = api.get_import_checkpoint(job_id) or {}
+    restart = False
+    if checkpoint.get("status") == "done":
+        st.info(f"This file was already imported ({checkpoint.get('imported', 0)} records).")
+        restart = st.checkbox("Import it again")
+        if not restart:
+            return
+    elif checkpoint:
+        st.info(f"Resuming a previous import of this file after row {checkpoint.get('rowsDone', 0)}.")
+
+    if st.button("Start Import", type="primary"):
+        total = bulk_import.estimate_rows(content, upload.name)
+        bar = st.progress(0.0, text="Importing...")
+
+        def progress(rows_done):
+            fraction = min(rows_done / total, 1.0) if total else 1.0
+            bar.progress(fraction, text=f"Importing... {rows_done}/{total} rows")
+
+        summary = api.import_records(content, upload.name, form_type, progress=progress, restart=restart)
+        if summary is not None:
+            bar.progress(1.0, text="Done")
+            show_summary(summary)
+
+
+main()
@@ -3,7 +3,9 @@ import json
 from datetime import datetime
 import math
 
-from api import get_logs
+from api import get_audit_log_error, get_log, get_logs_page, rebuild_log_index, search_logs
+from log_index import log_pic
+from user_profiles import is_admin
 
 
 # Load JSON data
@@ -16,7 +18,7 @@ def get_reference_actions(data):
     actions = []
     for _, entry in data.items():
         ref_no = entry.get("referenceNumber")
-        pic = entry.get("changedDetails", {}).get("customerForm", {}).get("pic", "")
+        pic = log_pic(entry)
         action = entry.get("action", "")
         timestamp = entry.get("timestamp", "")
         user = entry.get("user", {}).get("displayName", "")
@@ -44,61 +46,84 @@ def format_timestamp(ts):
 # Main Streamlit app
 def main():
     st.title("🔔 PIC Action Notifications")
-
-    data = get_logs()
-    actions = get_reference_actions(data)
-
-    # --- Search box ---
-    search_query = st.text_input("🔍 Search by Reference #, PIC, Action, or User", "")
-    if search_query:
-        query = search_query.lower()
-        actions = [
-            a for a in actions
-            if query in str(a["referenceNumber"]).lower()
-            or query in str(a["pic"]).lower()
-            or query in str(a["action"]).lower()
-            or query in str(a["user"]).lower()
-        ]
+    audit_error = get_audit_log_error()
+    if audit_error:
+        failed_at, message = audit_error
+        st.warning(f"Recent actions are not in the log yet: they are saved locally and retried "
+                   f"automatically ({message}, since {datetime.fromtimestamp(failed_at):%b %d, %Y %I:%M %p}).")
+
+    # --- Search box and date window ---
+    search_col, date_col = st.columns([3, 2])
+    with search_col:
+        search_query = st.text_input(
+            "🔍 Search by Reference #, PIC, Action, or User",
+            "",
+            help="Matches values that start with the search text"
+        )
+    with date_col:
+        date_range = st.date_input(
+            "Filter by Date Range",
+            [],
+            help="Select start and end date (optional)"
+        )
+    since, until = (date_range if len(date_range) == 2 else (None, None))
 
     # Pagination settings
     items_per_page = 10
-    total_items = len(actions)
-    total_pages = max(1, math.ceil(total_items / items_per_page))
 
-    st.subheader(f"📋 Recent PIC Actions (Total: {total_items})")
+    # Cursor stack for Previous/Next: log ID cursors, or page numbers while searching
+    if "log_cursors" not in st.session_state:
+        st.session_state.log_cursors = [None]
 
-    # Page navigator using Next/Previous buttons
-    if "page" not in st.session_state:
-        st.session_state.page = 1
-
-    # Reset to page 1 only if the search query has changed
+    # Reset to page 1 only if the search query or date window has changed
     if "last_search_query" not in st.session_state:
         st.session_state.last_search_query = ""
-    if search_query != st.session_state.last_search_query:
-        st.session_state.page = 1
+    if "last_log_window" not in st.session_state:
+        st.session_state.last_log_window = (None, None)
+    if (search_query != st.session_state.last_search_query
+            or (since, until) != st.session_state.last_log_window):
+        st.session_state.log_cursors = [None]
         st.session_state.last_search_query = search_query
+        st.session_state.last_log_window = (since, until)
 
-    prev_disabled = st.session_state.page <= 1
-    next_disabled = st.session_state.page >= total_pages
-    page = st.session_state.page
+    if search_query:
+        # Exact/prefix match against the log indexes; full entries are read per page
+        matches = [
+            {**summary, "log_id": log_id}
+            for log_id, summary in search_logs(search_query.strip())
+            if since is None or since.strftime("%Y%m%d") <= log_id[:8] <= until.strftime("%Y%m%d")
+        ]
+        page = len(st.session_state.log_cursors)
+        start_idx = (page - 1) * items_per_page
+        paginated_actions = [
+            {**m, "details": get_log(m["log_id"])}
+            for m in matches[start_idx:start_idx + items_per_page]
+        ]
+        has_next = start_idx + items_per_page < len(matches)
+        next_cursor = page
+    else:
+        page = len(st.session_state.log_cursors)
+        entries, next_cursor = get_logs_page(
+            cursor=st.session_state.log_cursors[-1],
+            limit=items_per_page,
+            since=since,
+            until=until
+        )
+        paginated_actions = get_reference_actions(dict(entries))
+        has_next = next_cursor is not None
+
+    st.subheader("📋 Recent PIC Actions")
 
     # Place Previous and Next buttons in a single row, each filling its column
     col1, col2 = st.columns([1, 1])
     with col1:
         if st.button("⬅️ Previous", use_container_width=True, disabled=(page == 1)):
-            if st.session_state.page > 1:
-                st.session_state.page -= 1
+            st.session_state.log_cursors.pop()
+            st.rerun()
     with col2:
-        if st.button("Next ➡️", use_container_width=True, disabled=next_disabled):
-            
-            if st.session_state.page < total_pages:
-                st.session_state.page += 1
-
-
-    # Determine which items to display
-    start_idx = (page - 1) * items_per_page
-    end_idx = start_idx + items_per_page
-    paginated_actions = actions[start_idx:end_idx]
+        if st.button("Next ➡️", use_container_width=True, disabled=not has_next):
+            st.session_state.log_cursors.append(next_cursor)
+            st.rerun()
 
     for action in paginated_actions:
         st.info(
@@ -110,6 +135,15 @@ def main():
         with st.expander("View Full Details"):
             st.json(action["details"])
 
-    st.markdown(f"Page **{page}** of **{total_pages}**")
+    st.markdown(f"Page **{page}**")
+
+    if is_admin():
+        with st.expander("🛠️ Search Index"):
+            st.caption("Existing logs are indexed automatically on the first search; "
+                       "rebuild if the index was lost or edited by hand.")
+            if st.button("Rebuild search index"):
+                indexed = rebuild_log_index()
+                if indexed is not None:
+                    st.success(f"Indexed {indexed} log entries.")
 
 main()
@@ -1,13 +1,17 @@
 import streamlit as st
 from datetime import datetime, timedelta
 from firebase_config import get_firestore
-import requests
-from PIL import Image
-import io
+from avatars import get_avatar_cache, pick_rendition
+from presence import get_presence
+from user_directory import get_user_directory
 from datetime import datetime, timezone
 
 # Initialize Firestore DB
 db = get_firestore()
+# Team member cards shown per page
+TEAM_PAGE_SIZE = 30
+# Seconds between automatic refreshes of the team grid
+TEAM_RERUN_INTERVAL = 15
 
 # ------------------------ Authentication Check ------------------------
 
@@ -15,57 +19,13 @@ db = get_firestore()
 def authenticate():
     return 'current_user' in st.session_state
 
-# ------------------------ Image Handling Utilities ------------------------
-
-
-def load_image(image_url, default_path='./pics/user.jpg'):
-    try:
-        if isinstance(image_url, bytes):
-            return Image.open(io.BytesIO(image_url))
-        if image_url and isinstance(image_url, str):
-            if image_url.startswith('http'):
-                response = requests.get(image_url, timeout=5)
-                if response.status_code == 200:
-                    return Image.open(io.BytesIO(response.content))
-            elif image_url != default_path:
-                return Image.open(image_url)
-        return Image.open(default_path)
-    except Exception:
-        return Image.open(default_path)
-
 # ------------------------ Fetch All Users ------------------------
 
 
-@st.cache_data(ttl=300, show_spinner="Loading user data...")
 def get_all_users():
     try:
-        users_ref = db.collection('users')
-        status_docs = db.collection('user_status').stream()
-        status_data = {doc.id: doc.to_dict() for doc in status_docs}
-
-        users = []
-        for doc in users_ref.stream():
-            user = doc.to_dict()
-            last_sign_in = user.get('last_sign_in')
-            users.append({
-                'uid': doc.id,
-                'email': user.get('email'),
-                'display_name': user.get('display_name') or user.get('email', '').split('@')[0],
-                'last_sign_in': last_sign_in,
-                'photo_url': user.get('profile_pic_url'),
-                'last_online': status_data.get(doc.id, {}).get('last_online'),
-                'role': user.get('role', 'Member'),
-                'department': user.get('department', 'Not specified'),
-                'bio': user.get('bio', ''),
-                'company': user.get('company', ''),
-                'position': user.get('position', ''),
-                'address': user.get('address', {}),
-                'skills': user.get('skills', []),
-                'first_name': user.get('first_name', ''),
-                'last_name': user.get('last_name', ''),
-                'phone': user.get('phone', '')
-            })
-        return users
+        last_seen = get_presence().last_seen()
+        return [dict(u, last_online=last_seen.get(u['uid'])) for u in get_user_directory().users()]
     except Exception as e:
         st.error(f"Error fetching users from Firestore: {e}")
         return []
@@ -74,31 +34,12 @@ def get_all_users():
 
 
 def update_last_online(uid):
-    try:
-        now = datetime.now()
-        db.collection('user_status').document(uid).set({
-            'last_online': now,
-            'updated_at': now
-        }, merge=True)
-    except Exception as e:
-        st.error(f"Error updating last online status: {e}")
-
+    # Debounced and written in the background by the presence service
+    get_presence().heartbeat(uid)
 
-def is_user_online(last_online):
-    if not last_online:
-        return False
 
-    # Convert Firestore timestamp if needed
-    if hasattr(last_online, 'to_datetime'):
-        last_online = last_online.to_datetime()
-
-    # Convert naive datetime to aware for safe comparison
-    if last_online.tzinfo is None:
-        last_online = last_online.replace(tzinfo=timezone.utc)
-
-    now = datetime.now(timezone.utc)
-
-    return (now - last_online) < timedelta(minutes=5)
+def is_user_online(uid):
+    return get_presence().is_online(uid)
 
 
 
@@ -133,22 +74,18 @@ def format_datetime(dt):
 def refresh_current_user():
     if 'current_user' in st.session_state and st.session_state['current_user'] is not None:
         uid = st.session_state['current_user']['uid']
-        users = get_all_users()
-        user = next((u for u in users if u['uid'] == uid), None)
+        user = get_user_directory().get_user(uid)
         if user:
             st.session_state['current_user'] = user
 
 
 # ------------------------ Profile Page ------------------------
-@st.cache_data(ttl=60, show_spinner="Loading profile data...")
 def get_profile_data(uid):
-    """Get cached profile data for a specific user"""
-    users = get_all_users()
-    return next((u for u in users if u['uid'] == uid), None)
+    """Get profile data for a specific user from the user directory"""
+    return get_user_directory().get_user(uid)
 
-@st.cache_data(ttl=60, show_spinner="Loading team data...")
 def get_team_data(current_uid, search_query, status_filter, sort_option):
-    """Get cached team data with filtering and sorting"""
+    """Get team data from the user directory with filtering and sorting"""
     users = get_all_users()
     users_filtered = [u for u in users if u['uid'] != current_uid]
     
@@ -162,7 +99,7 @@ def get_team_data(current_uid, search_query, status_filter, sort_option):
     if status_filter != "All":
         users_filtered = [
             u for u in users_filtered
-            if is_user_online(u['last_online']) == (status_filter == "Online")
+            if is_user_online(u['uid']) == (status_filter == "Online")
         ]
     
 
@@ -182,6 +119,88 @@ def get_team_data(current_uid, search_query, status_filter, sort_option):
     
     return users_sorted
 
+# ------------------------ Team Members ------------------------
+# Reruns on its own so online status, pushed into the presence map, stays current
+@st.fragment(run_every=TEAM_RERUN_INTERVAL)
+def team_members_section(current_uid):
+    # Keeps the viewer online while the page is open (writes are debounced)
+    update_last_online(current_uid)
+    st.markdown("<h2 style='color:#4B8BBE;'>👥 Team Members</h2>",
+                unsafe_allow_html=True)
+
+    search_col, filter_col = st.columns([3, 1])
+    with search_col:
+        search_query = st.text_input("Search by name or email", "")
+    with filter_col:
+        status_filter = st.selectbox("Status", ["All", "Online", "Offline"])
+
+    sort_option = st.selectbox(
+        "Sort by", ["Last Active", "Name", "Last Login"])
+    
+    # Get team data with current filters
+    team_members = get_team_data(
+        current_uid, 
+        search_query, 
+        status_filter, 
+        sort_option
+    )
+
+    # Render one page of cards at a time so large teams stay responsive
+    pages = max(1, -(-len(team_members) // TEAM_PAGE_SIZE))
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+        team_members = team_members[(page - 1) * TEAM_PAGE_SIZE:page * TEAM_PAGE_SIZE]
+
+    avatars = get_avatar_cache()
+    # Fetch every avatar on this page concurrently (cache hits need no network)
+    team_urls = [pick_rendition(u) for u in team_members]
+    team_avatars = avatars.get_many(team_urls)
+
+    cols = st.columns(3)
+    for idx, u in enumerate(team_members):
+        online = is_user_online(u['uid'])
+        status_color = "#4CAF50" if online else "#F44336"
+        address = u.get('address', {})
+        skills = ', '.join(u.get('skills', [])) or 'N/A'
+        bio = u.get('bio', '')
+        company = u.get('company', 'N/A')
+        position = u.get('position', 'N/A')
+
+        with cols[idx % 3]:
+            team_img = avatars.data_uri(team_avatars[team_urls[idx]])
+            st.markdown(f"""
+                <div style="
+                    background-color: #f6f8fa;
+                    border-radius: 10px;
+                    padding: 1rem;
+                    margin-bottom: 1rem;
+                    box-shadow: 0 1px 4px rgba(0,0,0,0.1);
+                    border-left: 4px solid {status_color};
+                    display: flex;
+                    align-items: flex-start;
+                    gap: 1rem;
+                ">
+                    <div>
+                        <img src="{team_img}" style="width:50px;height:50px;border-radius:50%;object-fit:cover;" />
+                    </div>
+                    <div style="flex:1;">
+                        <div style="font-weight: 600; margin-bottom: 0.5rem;">{u['display_name']}</div>
+                        <div style="font-size: 0.85rem; margin-bottom: 0.5rem;">
+                            <div>📧 {u['email']}</div>
+                            <div>🏢 {company}</div>
+                            <div>📍 {address.get('city', '')}, {address.get('country', '')}</div>
+                            <div>🛠️ Skills: {skills}</div>
+                            <div>📝 {bio}</div>
+                        </div>
+                        <div style="font-size: 0.8rem; color: #888;">
+                            <div>🕒 Last Active: {format_datetime(u['last_online'])}</div>
+                            <div>🔑 Last Login: {format_datetime(u['last_sign_in'])}</div>
+                        </div>
+                    </div>
+                </div>
+            """, unsafe_allow_html=True)
+
+
 def profile_page():
     if not authenticate():
         st.warning("Please log in to view your profile.")
@@ -220,12 +239,13 @@ def profile_page():
         </style>
     """, unsafe_allow_html=True)
 
-    # Load profile image, use default if not available
-    img = load_image(user.get('photo_url') or "./pics/user.jpg")
+    # Profile image thumbnail from the shared avatar cache, default if not available
+    avatars = get_avatar_cache()
+    img = avatars.get(pick_rendition(user))
     # Display profile image and name side by side, image circular and small
     col_img, col_name = st.columns([1, 25])
     with col_img:
-        st.image(img, width=80, caption="", output_format="PNG", clamp=True)
+        st.image(img, width=80, caption="")
         st.markdown(
             """
             <style>
@@ -296,83 +316,11 @@ def profile_page():
 
     st.markdown("---")
 
-    # ------------------------ Team Members ------------------------
-    st.markdown("<h2 style='color:#4B8BBE;'>👥 Team Members</h2>",
-                unsafe_allow_html=True)
-
-    search_col, filter_col = st.columns([3, 1])
-    with search_col:
-        search_query = st.text_input("Search by name or email", "")
-    with filter_col:
-        status_filter = st.selectbox("Status", ["All", "Online", "Offline"])
-
-    sort_option = st.selectbox(
-        "Sort by", ["Last Active", "Name", "Last Login"])
-    
-    # Get cached team data with current filters
-    team_members = get_team_data(
-        user['uid'], 
-        search_query, 
-        status_filter, 
-        sort_option
-    )
-
-    cols = st.columns(3)
-    for idx, u in enumerate(team_members):
-        online = is_user_online(u['last_online'])
-        status_color = "#4CAF50" if online else "#F44336"
-        address = u.get('address', {})
-        skills = ', '.join(u.get('skills', [])) or 'N/A'
-        bio = u.get('bio', '')
-        company = u.get('company', 'N/A')
-        position = u.get('position', 'N/A')
-
-        with cols[idx % 3]:
-            # Load and display user profile image using PIL for local or remote images
-            team_img = load_image(u.get('photo_url') or "./pics/user.jpg")
-            st.markdown(f"""
-                <div style="
-                    background-color: #f6f8fa;
-                    border-radius: 10px;
-                    padding: 1rem;
-                    margin-bottom: 1rem;
-                    box-shadow: 0 1px 4px rgba(0,0,0,0.1);
-                    border-left: 4px solid {status_color};
-                    display: flex;
-                    align-items: flex-start;
-                    gap: 1rem;
-                ">
-                    <div>
-                        <img src="data:image/png;base64,{Image_to_base64(team_img)}" style="width:50px;height:50px;border-radius:50%;object-fit:cover;" />
-                    </div>
-                    <div style="flex:1;">
-                        <div style="font-weight: 600; margin-bottom: 0.5rem;">{u['display_name']}</div>
-                        <div style="font-size: 0.85rem; margin-bottom: 0.5rem;">
-                            <div>📧 {u['email']}</div>
-                            <div>🏢 {company}</div>
-                            <div>📍 {address.get('city', '')}, {address.get('country', '')}</div>
-                            <div>🛠️ Skills: {skills}</div>
-                            <div>📝 {bio}</div>
-                        </div>
-                        <div style="font-size: 0.8rem; color: #888;">
-                            <div>🕒 Last Active: {format_datetime(u['last_online'])}</div>
-                            <div>🔑 Last Login: {format_datetime(u['last_sign_in'])}</div>
-                        </div>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-          
+    team_members_section(user['uid'])
 
     if st.button("🔄 Refresh Data"):
-        st.cache_data.clear()
+        get_user_directory().refresh(force=True)
+        get_presence().refresh(force=True)
         st.rerun()
 
-import base64
-
-def Image_to_base64(img):
-    """Convert a PIL Image to a base64-encoded string."""
-    buffered = io.BytesIO()
-    img.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
-
 profile_page()
\ No newline at end of file
@@ -1,94 +1,35 @@
 import streamlit as st
 import pandas as pd
 import json
-from api import get_records
-import io
-
-column_mapping = {
-    "referenceNumber": "Ref No",
-    "date": "Submission Date",
-    "details": "Details",
-    "pic": "PIC",
-    "rfqDate": "RFQ Date",
-    "vendorQuoteDate": "Vendor Quote Date",
-    "quotationNumber": "Quote No",
-    "quotationDate": "Quote Date",
-    "prfbackOrder": "PRF/Back Order",
-    "name": "Customer Name",
-    "status": "Status",
-    "customerPoNo": "Customer PO",
-    "cpoDate": "PO Date",
-    "epoNo": "Vendor PO",
-    "poDate": "Vendor PO Date",
-    "supplierName": "Supplier",
-    "sentByandDate": "Sent By",
-    "invoiceNo": "Vendor Invoice",
-    "invoiceDate": "Invoice Date",
-    "invoiceAmount": "Amount",
-    "bofNo": "BOF No",
-    "bofDate": "BOF Date",
-    "bofApproval": "BOF Approval",
-    "forInvoice": "Processing Status",
-    "invoiceNumberBilling": "Billing Invoice",
-    "invoiceDateBilling": "Billing Date",
-    "receivedByBilling": "Billing Received By",
-    "receivedDateBilling": "Billing Received Date",
-    "rfpNo": "RFP No",
-    "rfpDate": "RFP Date",
-    "rfpApproval": "RFP Approval",
-    "refNo": "RFP Ref No",
-    "refDate": "RFP Ref Date",
-    "receivedByRequest": "RFP Received By",
-    "receivedDateRequest": "RFP Received Date"
-}
+from api import bulk_update_field, get_record_rows, get_records_version
+from record_schema import COLUMN_LABELS, DATE_COLUMNS, FIELD_NAMES, FIELDS_BY_NAME, STATUSES
+from records_table import EXPORT_FORMATS, FilterIndex, build_table, export_table, filter_positions
 
+column_mapping = COLUMN_LABELS
+
+# Column order for the table, from record_schema
+desired_columns = FIELD_NAMES
 
 # Configure page
 st.title("📋 View Tables")
 st.markdown("Easily browse, search, and filter your records.")
 
 
-def flatten_data(data):
-    """Flatten nested JSON structure into records."""
-    if not data:
-        return []
-
-    records = []
-    for ref_no, forms in data.items():
-        row = {'referenceNumber': ref_no}
-        for form in forms.values():
-            if isinstance(form, dict):
-                row.update(form)
-        records.append(row)
-    return records
-
-
-def apply_filters(df, search_term, date_col, start_date, end_date):
-    """Apply search and date filters to the DataFrame."""
-    filtered_df = df.copy()
-
-    # Apply search filter
-    if search_term:
-        search_term = search_term.lower()
-        filtered_df = filtered_df[filtered_df.apply(
-            lambda row: row.astype(str).str.lower(
-            ).str.contains(search_term).any(),
-            axis=1
-        )]
-
-    # Apply date filter if date column exists
-    if date_col and date_col in filtered_df.columns and start_date and end_date:
-        try:
-            filtered_df[date_col] = pd.to_datetime(
-                filtered_df[date_col], errors='coerce', dayfirst=True)
-            filtered_df = filtered_df[
-                (filtered_df[date_col] >= pd.to_datetime(start_date)) &
-                (filtered_df[date_col] <= pd.to_datetime(end_date))
-            ]
-        except Exception as e:
-            st.warning(f"Could not filter by date: {str(e)}")
-
-    return filtered_df
+@st.cache_data(show_spinner="Loading records...", max_entries=2)
+def load_table(version):
+    """Build the typed, ordered table once per record-store version."""
+    df = build_table(get_record_rows(form_type="New Reference"), desired_columns)
+    # Search text and parsed dates are built once per load, not per rerun
+    return df, FilterIndex(df, DATE_COLUMNS)
+
+
+@st.cache_data(show_spinner="Preparing export...", max_entries=8)
+def export_filtered(version, search_term, date_col, start_date, end_date, fmt):
+    """Export the filtered table; cached per data version and filter signature."""
+    df, filter_index = load_table(version)
+    positions = filter_positions(
+        df, filter_index, search_term, date_col, start_date, end_date)
+    return export_table(df.iloc[positions], fmt, column_mapping, filter_index.dates)
 
 
 def display_row_details(row):
@@ -118,6 +59,32 @@ def display_row_details(row):
         )
 
 
+def display_bulk_update(reference_numbers, filtered_count, filtered_refs):
+    """Action panel to set one field on the selected (or all filtered) records."""
+    st.markdown("---")
+    with st.expander("✏️ Bulk Update", expanded=bool(reference_numbers)):
+        st.caption(f"{len(reference_numbers)} row(s) selected on this page.")
+        apply_to_all = st.checkbox(f"Apply to all {filtered_count} filtered records instead")
+        field_labels = {column_mapping[name]: name for name in desired_columns
+                        if name != "referenceNumber"}
+        field = field_labels[st.selectbox(
+            "Field", list(field_labels), index=list(field_labels.values()).index("status"))]
+        if field == "status":
+            value = st.selectbox("New value", STATUSES)
+        elif FIELDS_BY_NAME[field].is_date:
+            value = st.date_input("New value")
+        else:
+            value = st.text_input("New value")
+
+        targets = filtered_refs() if apply_to_all else reference_numbers
+        if st.button(f"Apply to {len(targets)} record(s)", type="primary", disabled=not targets):
+            result = bulk_update_field(targets, field, value)
+            # On failure bulk_update_field has shown the error; keep it on screen
+            if result is not None:
+                st.session_state.bulk_update_result = (column_mapping[field], result)
+                st.rerun()
+
+
 def main():
     # Initialize session state
     if "page_num" not in st.session_state:
@@ -126,33 +93,12 @@ def main():
         st.session_state.selected_row = None
 
     # Load and process data
-    @st.cache_data(show_spinner="Loading records...", ttl=600)
-    def load_data():
-        return get_records(form_type="New Reference")
-    data = load_data()
-    if data is None:
-        return
-
-    records = flatten_data(data)[::-1]
-    if not records:
+    version = get_records_version(form_type="New Reference")
+    df, filter_index = load_table(version)
+    if df.empty:
         st.warning("No records found in the data.")
         return
 
-    # Define the desired column order and display names
-    desired_columns = [
-        "referenceNumber", "name", "date", "details", "pic", "rfqDate", "vendorQuoteDate",
-        "quotationNumber", "quotationDate", "prfbackOrder", "status", "customerPoNo", "cpoDate",
-        "epoNo", "poDate", "supplierName", "sentByandDate", "invoiceNo", "invoiceDate", "invoiceAmount",
-        "bofNo", "bofDate", "bofApproval", "forInvoice", "invoiceNumberBilling", "invoiceDateBilling",
-        "receivedByBilling", "receivedDateBilling", "rfpNo", "rfpDate", "rfpApproval", "refNo",
-        "refDate", "receivedByRequest", "receivedDateRequest"
-    ]
-
-    # Create DataFrame and reorder columns
-    df = pd.DataFrame(records)
-    # Only keep columns that exist in the DataFrame
-    df = df[[col for col in desired_columns if col in df.columns]]
-
     # Sidebar for filters
     with st.sidebar:
         st.header("Filters")
@@ -161,7 +107,7 @@ def main():
         search_term = st.text_input("Search records")
 
         # Date filter
-        date_cols = [col for col in df.columns if 'date' in col.lower()]
+        date_cols = [col for col in df.columns if col in DATE_COLUMNS]
         date_col = None
         start_date = None
         end_date = None
@@ -197,13 +143,13 @@ def main():
                 if start_date and end_date and start_date > end_date:
                     st.warning("Start date must be before end date")
 
-    # Apply filters
-    filtered_df = apply_filters(
-        df, search_term, date_col, start_date, end_date)
+    # Apply filters (row positions only; rows are copied just for the visible page)
+    positions = filter_positions(
+        df, filter_index, search_term, date_col, start_date, end_date)
 
     # Pagination settings
     PAGE_SIZE = 10
-    total_pages = max(1, (len(filtered_df) + PAGE_SIZE - 1) // PAGE_SIZE)
+    total_pages = max(1, (len(positions) + PAGE_SIZE - 1) // PAGE_SIZE)
     current_page = st.session_state.page_num
 
     # Ensure current page is within valid range
@@ -212,7 +158,7 @@ def main():
         current_page = total_pages
 
     # Display record count
-    st.markdown(f"**Total records: {len(filtered_df)}**")
+    st.markdown(f"**Total records: {len(positions)}**")
 
     # Pagination controls
     col1, col2, col3, col4 = st.columns([2, 2, 1, 2])
@@ -226,40 +172,57 @@ def main():
     # Show current page data
     start = (current_page - 1) * PAGE_SIZE
     end = start + PAGE_SIZE
-    current_page_data = filtered_df.iloc[start:end].copy()
+    current_page_data = df.iloc[positions[start:end]]
     current_page_data_display = current_page_data.rename(
         columns=column_mapping)
 
     # Display the data with selection
-    st.markdown("**Hover over a row and click to view details**")
+    st.markdown("**Click a row to view details; select several to update them together**")
     selected_index = st.dataframe(
         current_page_data_display,
         use_container_width=True,
         height=min(600, (PAGE_SIZE + 1) * 35),
         on_select="rerun",
-        selection_mode="single-row",
+        selection_mode="multi-row",
         hide_index=True
     )
 
     # Store selected row in session state
-    if selected_index.selection.rows:
-        selected_row_index = selected_index.selection.rows[0]
-        st.session_state.selected_row = current_page_data.iloc[selected_row_index].to_dict(
+    selected_rows = selected_index.selection.rows
+    if len(selected_rows) == 1:
+        st.session_state.selected_row = current_page_data.iloc[selected_rows[0]].to_dict(
         )
     st.markdown(f"**Page {current_page} of {total_pages}**",
                 unsafe_allow_html=True)
+    if "bulk_update_result" in st.session_state:
+        label, result = st.session_state.pop("bulk_update_result")
+        st.success(f"Updated {label} on {result['updated']} record(s); "
+                   f"{result['unchanged']} already had that value.")
+        if result["missing"]:
+            st.warning(f"{len(result['missing'])} record(s) no longer exist and were skipped: "
+                       f"{', '.join(result['missing'])}")
+    display_bulk_update(
+        current_page_data["referenceNumber"].iloc[selected_rows].tolist(),
+        len(positions),
+        lambda: df["referenceNumber"].iloc[positions].tolist()
+    )
     if st.session_state.selected_row:
         display_row_details(st.session_state.selected_row)
 
-    # Download button for filtered table as XLSX
-    output = io.BytesIO()
-    filtered_df.rename(columns=column_mapping).to_excel(output, index=False, engine='openpyxl')
-    st.download_button(
-        label="⬇️ Download Table as XLSX",
-        data=output.getvalue(),
-        file_name="smart_sourcing_records.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    # Export is only built when requested, then cached per filter signature
+    st.markdown("---")
+    export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
+    signature = (version, search_term, date_col, start_date, end_date, export_format)
+    if st.button("📦 Prepare Download"):
+        st.session_state.export_signature = signature
+    if st.session_state.get("export_signature") == signature:
+        extension, mime = EXPORT_FORMATS[export_format]
+        st.download_button(
+            label=f"⬇️ Download Table as {export_format}",
+            data=export_filtered(*signature),
+            file_name=f"smart_sourcing_records.{extension}",
+            mime=mime
+        )
 
 
 main()
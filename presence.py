@@ -0,0 +1,199 @@
+import atexit
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import streamlit as st
+from firebase_admin.firestore import SERVER_TIMESTAMP
+
+from firebase_config import get_firestore
+from user_directory import CollectionSync
+
+USER_STATUS = 'user_status'
+# Write a user's heartbeat at most this often (seconds)
+HEARTBEAT_INTERVAL = 60
+# Seen within this window counts as online. The Admin SDK has no onDisconnect,
+# so a user only goes offline once their heartbeats stop arriving.
+ONLINE_WINDOW = timedelta(minutes=5)
+# Heartbeats queued within this many seconds share one batch write
+FLUSH_INTERVAL = 2.0
+# Re-read other users' presence at most this often (seconds)
+REFRESH_INTERVAL = 30
+# Longest wait for the snapshot listener's first result before polling instead (seconds)
+SYNC_TIMEOUT = 10
+# Firestore write batches are limited to 500 operations
+MAX_BATCH_SIZE = 500
+
+
+def as_utc(value):
+    """A stored last_online value as an aware UTC datetime (None stays None)."""
+    if value is None:
+        return None
+    if hasattr(value, 'to_datetime'):
+        value = value.to_datetime()
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class Presence:
+    """Cached last_online map with debounced, background heartbeat writes.
+
+    ``heartbeat`` records the user as seen straight away but queues the
+    user_status write, at most once per ``heartbeat_interval`` per user; a
+    worker thread commits queued heartbeats together in one batch.
+
+    Other users' presence is pushed into the map by a snapshot listener on
+    user_status, so reads make no network calls. Where no listener can be
+    started, or it stops, the map is instead re-read incrementally (by
+    updated_at) at most every ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, db, heartbeat_interval=HEARTBEAT_INTERVAL, flush_interval=FLUSH_INTERVAL,
+                 refresh_interval=REFRESH_INTERVAL, listen=True):
+        self.db = db
+        self.heartbeat_interval = heartbeat_interval
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._sync = CollectionSync(db, USER_STATUS)
+        self._last_online = {}
+        self._beats = {}
+        self._pending = {}
+        self._refreshed_at = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="presence-writer", daemon=True)
+        self._worker.start()
+        self._listener = None
+        self._synced = threading.Event()
+        if listen:
+            self._listen()
+        atexit.register(self.close)
+
+    def heartbeat(self, uid):
+        """Mark uid as online now; returns True when a write was queued."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._beats.get(uid)
+            if last is not None and now - last < self.heartbeat_interval:
+                return False
+            self._beats[uid] = now
+            seen = datetime.now(timezone.utc)
+            self._pending[uid] = seen
+            self._seen(uid, seen)
+        self._wake.set()
+        return True
+
+    def last_online(self, uid):
+        self.refresh()
+        with self._lock:
+            return self._last_online.get(uid)
+
+    def last_seen(self):
+        """{uid: last_online} for every known user."""
+        self.refresh()
+        with self._lock:
+            return dict(self._last_online)
+
+    def is_online(self, uid, now=None):
+        last_online = self.last_online(uid)
+        if last_online is None:
+            return False
+        return (now or datetime.now(timezone.utc)) - last_online < ONLINE_WINDOW
+
+    @property
+    def listening(self):
+        """True while the snapshot listener is keeping the map current."""
+        return (self._listener is not None and self._synced.is_set()
+                and getattr(self._listener, 'is_active', True))
+
+    def refresh(self, force=False):
+        """Read changed user_status documents if the map is older than refresh_interval.
+
+        Does nothing while the snapshot listener is active.
+        """
+        if self.listening:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._refreshed_at is None:
+                snapshots = self._sync.load_all()
+            elif force or now - self._refreshed_at >= self.refresh_interval:
+                snapshots = self._sync.changed()
+            else:
+                return
+            for snapshot in snapshots:
+                self._seen(snapshot.id, (snapshot.to_dict() or {}).get('last_online'))
+            self._refreshed_at = time.monotonic()
+
+    def flush(self):
+        """Write every queued heartbeat now."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        for start in range(0, len(items), MAX_BATCH_SIZE):
+            chunk = items[start:start + MAX_BATCH_SIZE]
+            try:
+                batch = self.db.batch()
+                for uid, seen in chunk:
+                    batch.set(self.db.collection(USER_STATUS).document(uid),
+                              {'last_online': seen, 'updated_at': SERVER_TIMESTAMP}, merge=True)
+                batch.commit()
+            except Exception as e:
+                print(f"Presence heartbeat write failed for {len(chunk)} users: {e}")
+                with self._lock:
+                    # Retry with the next flush unless a newer heartbeat is already queued
+                    for uid, seen in chunk:
+                        self._pending.setdefault(uid, seen)
+
+    def close(self, timeout=10):
+        """Stop the listener, and the worker after writing queued heartbeats."""
+        if self._stopped.is_set():
+            return
+        if self._listener is not None:
+            self._listener.unsubscribe()
+        self._stopped.set()
+        self._wake.set()
+        self._worker.join(timeout)
+
+    def _listen(self):
+        try:
+            self._listener = self.db.collection(USER_STATUS).on_snapshot(self._on_snapshot)
+        except Exception as e:
+            print(f"Presence listener unavailable, polling user_status instead: {e}")
+            self._listener = None
+            return
+        # The first snapshot carries every document; until then reads poll as usual
+        self._synced.wait(SYNC_TIMEOUT)
+
+    def _on_snapshot(self, docs, changes, read_time):
+        with self._lock:
+            for change in changes:
+                uid = change.document.id
+                if change.type.name == 'REMOVED':
+                    self._last_online.pop(uid, None)
+                else:
+                    self._seen(uid, (change.document.to_dict() or {}).get('last_online'))
+        self._synced.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            # Let heartbeats from other sessions arrive and share the batch
+            self._stopped.wait(self.flush_interval)
+            self.flush()
+        self.flush()
+
+    def _seen(self, uid, last_online):
+        last_online = as_utc(last_online)
+        current = self._last_online.get(uid)
+        if last_online is not None and (current is None or last_online > current):
+            self._last_online[uid] = last_online
+
+
+@st.cache_resource(show_spinner=False)
+def get_presence():
+    """Process-wide presence map and heartbeat writer shared by every session."""
+    return Presence(get_firestore())
@@ -0,0 +1,44 @@
+from record_schema import FIELDS_BY_NAME, SECTIONS, ProcurementRecord
+
+
+def _change_key(section, field):
+    # Schema fields are unique across sections; anything else keeps its section
+    spec = FIELDS_BY_NAME.get(field)
+    return field if spec and spec.section == section else f"{section}/{field}"
+
+
+def diff_records(reference_number, old, new):
+    """Changeset ``{field: [old, new]}`` between two records, raw or as returned by to_dict.
+
+    Both sides are compared in their Firebase form (dates as ISO strings), so a
+    date object and its string are equal. A value of None means "absent".
+    """
+    old = ProcurementRecord.from_firebase(reference_number, old).to_firebase() if old else {}
+    new = ProcurementRecord.from_firebase(reference_number, new).to_firebase() if new else {}
+    changes = {}
+    for section in SECTIONS:
+        old_section, new_section = old.get(section, {}), new.get(section, {})
+        for field in old_section.keys() | new_section.keys():
+            before, after = old_section.get(field), new_section.get(field)
+            if before != after:
+                changes[_change_key(section, field)] = [before, after]
+    return changes
+
+
+def update_paths(changeset):
+    """RTDB multi-path update ``{"section/field": new}`` for a changeset (None deletes)."""
+    paths = {}
+    for key, (_, after) in changeset.items():
+        spec = FIELDS_BY_NAME.get(key)
+        paths[f"{spec.section}/{key}" if spec else key] = after
+    return paths
+
+
+def log_changes(changeset):
+    """The changeset as stored in an audit log entry.
+
+    RTDB keys cannot contain "/" and arrays cannot hold nulls, so extra fields
+    are logged as "section:field" and absent values as "".
+    """
+    return {key.replace("/", ":"): ["" if value is None else value for value in pair]
+            for key, pair in changeset.items()}
@@ -0,0 +1,239 @@
+import gc
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime
+
+
+# Fields default to None, meaning "absent in Firebase"; to_dict/to_firebase leave them out.
+def _text(label):
+    return field(default=None, metadata={"label": label, "date": False})
+
+
+def _date(label):
+    return field(default=None, metadata={"label": label, "date": True})
+
+
+# ------------------------ Form sections ------------------------
+# Field order within each section is the View Tables column order.
+
+@dataclass(slots=True)
+class CustomerForm:
+    referenceNumber: str = _text("Ref No")
+    name: str = _text("Customer Name")
+    date: object = _date("Submission Date")
+    details: str = _text("Details")
+    pic: str = _text("PIC")
+    rfqDate: object = _date("RFQ Date")
+    vendorQuoteDate: object = _date("Vendor Quote Date")
+    quotationNumber: str = _text("Quote No")
+    quotationDate: object = _date("Quote Date")
+    prfbackOrder: str = _text("PRF/Back Order")
+    status: str = _text("Status")
+    customerPoNo: str = _text("Customer PO")
+    cpoDate: object = _date("PO Date")
+    extra: dict = None
+
+
+@dataclass(slots=True)
+class VendorForm:
+    epoNo: str = _text("Vendor PO")
+    poDate: object = _date("Vendor PO Date")
+    supplierName: str = _text("Supplier")
+    sentByandDate: str = _text("Sent By")
+    invoiceNo: str = _text("Vendor Invoice")
+    invoiceDate: object = _date("Invoice Date")
+    invoiceAmount: str = _text("Amount")
+    extra: dict = None
+
+
+@dataclass(slots=True)
+class BillingOrderForm:
+    bofNo: str = _text("BOF No")
+    bofDate: object = _date("BOF Date")
+    bofApproval: str = _text("BOF Approval")
+    forInvoice: str = _text("Processing Status")
+    invoiceNumberBilling: str = _text("Billing Invoice")
+    invoiceDateBilling: object = _date("Billing Date")
+    receivedByBilling: str = _text("Billing Received By")
+    receivedDateBilling: object = _date("Billing Received Date")
+    extra: dict = None
+
+
+@dataclass(slots=True)
+class RequestForPaymentForm:
+    rfpNo: str = _text("RFP No")
+    rfpDate: object = _date("RFP Date")
+    rfpApproval: str = _text("RFP Approval")
+    refNo: str = _text("RFP Ref No")
+    refDate: object = _date("RFP Ref Date")
+    receivedByRequest: str = _text("RFP Received By")
+    receivedDateRequest: object = _date("RFP Received Date")
+    extra: dict = None
+
+
+# Values offered for customerForm.status, in workflow order
+STATUSES = ["Open", "QV", "QC", "POC", "POV", "DV", "DC", "BOF", "RFP", "Closed", "Cancelled"]
+
+# Firebase section key -> section type, in View Tables column order
+SECTIONS = {
+    "customerForm": CustomerForm,
+    "vendorForm": VendorForm,
+    "billingOrderForm": BillingOrderForm,
+    "requestForPaymentForm": RequestForPaymentForm,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class FieldSpec:
+    name: str
+    section: str
+    label: str
+    is_date: bool
+
+
+FIELDS = tuple(
+    FieldSpec(f.name, section, f.metadata["label"], f.metadata["date"])
+    for section, cls in SECTIONS.items()
+    for f in fields(cls) if f.name != "extra"
+)
+FIELDS_BY_NAME = {spec.name: spec for spec in FIELDS}
+FIELD_NAMES = [spec.name for spec in FIELDS]
+COLUMN_LABELS = {spec.name: spec.label for spec in FIELDS}
+DATE_COLUMNS = [spec.name for spec in FIELDS if spec.is_date]
+DATE_FIELDS = {
+    section: tuple(spec.name for spec in FIELDS if spec.section == section and spec.is_date)
+    for section in SECTIONS
+}
+
+# Per section: (field names, positions of date fields, known names) for the converters
+_LAYOUT = {
+    section: (
+        tuple(spec.name for spec in FIELDS if spec.section == section),
+        tuple(i for i, spec in enumerate(
+            [spec for spec in FIELDS if spec.section == section]) if spec.is_date),
+        frozenset(spec.name for spec in FIELDS if spec.section == section),
+    )
+    for section in SECTIONS
+}
+
+
+# Firebase section key -> ProcurementRecord attribute
+_SECTION_ATTRS = dict(zip(SECTIONS, ("customer", "vendor", "billing", "payment")))
+
+
+@dataclass(slots=True)
+class ProcurementRecord:
+    """One /forms or /aftersales record with typed sections."""
+    reference_number: str
+    customer: CustomerForm
+    vendor: VendorForm
+    billing: BillingOrderForm
+    payment: RequestForPaymentForm
+    last_modified: object = None
+
+    @classmethod
+    def from_firebase(cls, reference_number, data, _cache=None):
+        """Build a record from the raw RTDB value, parsing date fields."""
+        data = data or {}
+        sections = [_section_from_firebase(section, data.get(section), _cache)
+                    for section in SECTIONS]
+        return cls(reference_number, *sections, last_modified=data.get("lastModified"))
+
+    def sections(self):
+        return zip(SECTIONS, (self.customer, self.vendor, self.billing, self.payment))
+
+    def section(self, name):
+        """The form for a Firebase section key, e.g. ``"vendorForm"``."""
+        return getattr(self, _SECTION_ATTRS[name])
+
+    def to_dict(self):
+        """Nested {section: {field: value}} dict with date objects, as the forms expect."""
+        return {section: _section_to_dict(section, form, False) for section, form in self.sections()}
+
+    def to_firebase(self):
+        """Nested dict ready to write to RTDB (dates as ISO strings)."""
+        return {section: _section_to_dict(section, form, True) for section, form in self.sections()}
+
+    def flat_row(self):
+        """Single-level {column: value} row in View Tables column order."""
+        row = {}
+        for section, form in self.sections():
+            for name in _LAYOUT[section][0]:
+                row[name] = getattr(form, name)
+        row["referenceNumber"] = row["referenceNumber"] or self.reference_number
+        return row
+
+
+def _section_from_firebase(section, data, _cache):
+    cls = SECTIONS[section]
+    if not isinstance(data, dict):
+        return cls()
+    names, date_positions, known = _LAYOUT[section]
+    get = data.get
+    values = [get(name) for name in names]
+    for i in date_positions:
+        value = values[i]
+        # Bulk loads repeat the same few hundred dates; skip the call on a cache hit
+        parsed = _cache.get(value) if _cache is not None and value.__class__ is str else None
+        values[i] = parsed if parsed is not None else parse_date(value, _cache)
+    extra = None if known.issuperset(data) else {
+        k: v for k, v in data.items() if k not in known}
+    return cls(*values, extra)
+
+
+def _section_to_dict(section, form, serialize):
+    names = _LAYOUT[section][0]
+    result = {}
+    for name in names:
+        value = getattr(form, name)
+        if value is None:
+            continue
+        if serialize and isinstance(value, date):
+            value = value.isoformat() if isinstance(value, datetime) else str(value)
+        result[name] = value
+    if form.extra:
+        result.update(form.extra)
+    return result
+
+
+# ------------------------ Date conversion ------------------------
+
+def parse_date(value, _cache=None):
+    """Parse an ISO date/datetime string into a date (midnight) or datetime.
+
+    Anything that is not an ISO string (e.g. "None" or "") is returned unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+    if _cache is not None:
+        cached = _cache.get(value)
+        if cached is not None:
+            return cached
+    parsed = value
+    try:
+        if len(value) == 10:
+            parsed = date.fromisoformat(value)
+        else:
+            parsed_dt = datetime.fromisoformat(value)
+            parsed = parsed_dt.date() if parsed_dt.time() == datetime.min.time() else parsed_dt
+    except ValueError:
+        pass
+    if _cache is not None:
+        _cache[value] = parsed
+    return parsed
+
+
+def records_from_firebase(records):
+    """Typed records for a {reference: raw record} mapping, sharing parsed dates.
+
+    The cyclic garbage collector is paused meanwhile: every object built here
+    is kept, and its collections would otherwise rescan the growing result
+    hundreds of times on a large tree.
+    """
+    cache = {}
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return {ref: ProcurementRecord.from_firebase(ref, data, cache) for ref, data in records.items()}
+    finally:
+        if enabled:
+            gc.enable()
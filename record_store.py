@@ -0,0 +1,152 @@
+import copy
+import threading
+import time
+
+
+class RecordStore:
+    """Per-process copy of one Realtime Database record tree (/forms or /aftersales).
+
+    The tree is downloaded once; afterwards ``sync`` only pulls records whose
+    ``lastModified`` stamp moved past the last one seen, plus a shallow key
+    listing to pick up deletes and records written without a stamp.
+    ``lastModified`` must be listed in the node's ``.indexOn`` rule.
+
+    The highest reference number is tracked alongside the records so
+    ``latest_key`` never scans the keys, and ``version`` increases whenever
+    any record changes so derived views can be cached per version.
+    """
+
+    def __init__(self, path, convert=None, convert_many=None,
+                 sync_interval=30, full_reload_interval=1800):
+        self.path = path
+        # convert(key, raw) -> stored value; convert_many({key: raw}) is used for full loads
+        self._convert = convert or (lambda key, record: record)
+        self._convert_many = convert_many or (
+            lambda records: {k: self._convert(k, v) for k, v in records.items()})
+        self._sync_interval = sync_interval
+        self._full_reload_interval = full_reload_interval
+        self._records = {}
+        self._loaded = False
+        self._last_sync = 0.0
+        self._last_full_load = 0.0
+        self._high_water = 0
+        self._latest_key = None
+        self._latest_checked = None
+        self._version = 0
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    @property
+    def version(self):
+        return self._version
+
+    def snapshot(self):
+        """Return a shallow copy of the records, keyed by reference number."""
+        with self._lock:
+            return dict(self._records)
+
+    def get(self, key):
+        with self._lock:
+            return self._records.get(key)
+
+    def latest_key(self, reference):
+        """Return the highest reference number without loading the tree.
+
+        Once the store is loaded the maintained index is used; before that a
+        throttled ``order_by_key().limit_to_last(1)`` query seeds it.
+        """
+        with self._lock:
+            if self._loaded:
+                self.sync(reference)
+                return self._latest_key
+            now = time.monotonic()
+            if self._latest_checked is None or now - self._latest_checked >= self._sync_interval:
+                last = reference.order_by_key().limit_to_last(1).get() or {}
+                self._latest_key = max(last, default=None)
+                self._latest_checked = now
+            return self._latest_key
+
+    def sync(self, reference, force=False):
+        """Bring the store up to date using ``reference`` (an RTDB Reference for ``path``)."""
+        with self._lock:
+            now = time.monotonic()
+            if not self._loaded or now - self._last_full_load >= self._full_reload_interval:
+                self._full_load(reference, now)
+            elif force or now - self._last_sync >= self._sync_interval:
+                try:
+                    self._incremental_sync(reference, now)
+                except Exception:
+                    # Missing .indexOn rule or a failed query: fall back to a full download
+                    self._full_load(reference, now)
+
+    def put(self, key, record):
+        """Patch a single record after a local write."""
+        with self._lock:
+            self._records[key] = self._convert(key, copy.deepcopy(record))
+            self._track(record)
+            self._bump_latest(key)
+            self._version += 1
+
+    def remove(self, key):
+        """Drop a single record after a local delete."""
+        with self._lock:
+            if self._records.pop(key, None) is not None:
+                self._version += 1
+            if key == self._latest_key:
+                if self._loaded:
+                    self._latest_key = max(self._records, default=None)
+                else:
+                    self._latest_checked = None
+
+    def _full_load(self, reference, now):
+        records = reference.get() or {}
+        self._high_water = 0
+        for record in records.values():
+            self._track(record)
+        self._records = self._convert_many(records)
+        self._latest_key = max(self._records, default=None)
+        self._version += 1
+        self._loaded = True
+        self._last_full_load = now
+        self._last_sync = now
+
+    def _incremental_sync(self, reference, now):
+        changed = reference.order_by_child('lastModified').start_at(self._high_water).get() or {}
+        version = self._version
+        for key, record in changed.items():
+            converted = self._convert(key, record)
+            # start_at is inclusive, so the newest known record comes back every time
+            if self._records.get(key) != converted:
+                self._records[key] = converted
+                version += 1
+            self._track(record)
+            self._bump_latest(key)
+
+        keys = reference.get(shallow=True) or {}
+        removed = set(self._records) - set(keys)
+        for key in removed:
+            del self._records[key]
+            version += 1
+        for key in set(keys) - set(self._records):
+            # Written by a client that does not stamp lastModified
+            record = reference.child(key).get()
+            if record is not None:
+                self._records[key] = self._convert(key, record)
+                self._bump_latest(key)
+                version += 1
+        if self._latest_key in removed:
+            self._latest_key = max(self._records, default=None)
+        self._version = version
+        self._last_sync = now
+
+    def _bump_latest(self, key):
+        if self._latest_key is None or key > self._latest_key:
+            self._latest_key = key
+
+    def _track(self, record):
+        stamp = record.get('lastModified') if isinstance(record, dict) else None
+        if isinstance(stamp, (int, float)) and stamp > self._high_water:
+            self._high_water = stamp
@@ -0,0 +1,123 @@
+import io
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ["status", "pic", "supplierName"]
+
+# Joins column values in the search text so a term cannot match across two columns
+_SEARCH_SEPARATOR = "\x1f"
+
+
+def build_table(rows, columns):
+    """DataFrame of flat record rows restricted to ``columns`` (in that order)."""
+    df = pd.DataFrame(rows, columns=columns)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+class FilterIndex:
+    """Search and date lookups precomputed once per data load.
+
+    ``search_text`` is one lowercase string per row holding every column, and
+    ``dates`` holds each date column already parsed with ``pd.to_datetime``,
+    so filtering a rerun is a couple of vectorized comparisons.
+    """
+
+    def __init__(self, df, date_columns=None):
+        if date_columns is None:
+            date_columns = [col for col in df.columns if 'date' in col.lower()]
+        self.search_text = _search_text(df)
+        self.dates = {
+            col: pd.to_datetime(df[col], errors='coerce', dayfirst=True)
+            for col in date_columns if col in df.columns
+        }
+
+    def mask(self, search_term=None, date_col=None, start_date=None, end_date=None):
+        """Boolean row mask for the given search term and date range (None = no filter)."""
+        mask = None
+        if search_term:
+            mask = self.search_text.str.contains(
+                search_term.lower(), regex=False)
+        if date_col in self.dates and start_date and end_date:
+            dates = self.dates[date_col]
+            in_range = (dates >= pd.to_datetime(start_date)) & (
+                dates <= pd.to_datetime(end_date))
+            mask = in_range if mask is None else mask & in_range
+        return mask
+
+
+def _search_text(df):
+    if df.empty or not len(df.columns):
+        return pd.Series("", index=df.index, dtype=object)
+    columns = [df[col].astype(str).str.lower() for col in df.columns]
+    text = columns[0]
+    for column in columns[1:]:
+        text = text + _SEARCH_SEPARATOR + column
+    return text
+
+
+def filter_positions(df, index, search_term, date_col, start_date, end_date):
+    """Row positions of ``df`` that pass the filters, so a page can be sliced without copying."""
+    mask = index.mask(search_term, date_col, start_date, end_date)
+    if mask is None:
+        return np.arange(len(df))
+    return np.flatnonzero(mask.to_numpy())
+
+
+def apply_filters(df, index, search_term, date_col, start_date, end_date):
+    """Apply search and date filters to the DataFrame using its FilterIndex."""
+    mask = index.mask(search_term, date_col, start_date, end_date)
+    if mask is None:
+        return df
+    return df[mask.to_numpy()]
+
+
+# Export format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def export_table(df, fmt, column_mapping=None, dates=None):
+    """Serialize ``df`` for download as XLSX, CSV or Parquet and return the bytes.
+
+    XLSX is written with a write-only (streaming) openpyxl workbook. For
+    Parquet, ``dates`` (e.g. ``FilterIndex.dates``) supplies typed date
+    columns, since the raw columns mix dates with placeholder strings.
+    """
+    column_mapping = column_mapping or {}
+    output = io.BytesIO()
+    if fmt == "XLSX":
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append([column_mapping.get(col, col) for col in df.columns])
+        for row in df.itertuples(index=False, name=None):
+            sheet.append([None if _is_missing(value) else value for value in row])
+        workbook.save(output)
+    elif fmt == "CSV":
+        df.rename(columns=column_mapping).to_csv(output, index=False, encoding="utf-8-sig")
+    elif fmt == "Parquet":
+        typed = df.copy()
+        for col in typed.columns:
+            if dates and col in dates:
+                typed[col] = dates[col].reindex(typed.index)
+            elif typed[col].dtype == object:
+                typed[col] = typed[col].astype(str)
+        typed.rename(columns=column_mapping).to_parquet(output, index=False)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return output.getvalue()
+
+
+def _is_missing(value):
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
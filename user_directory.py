@@ -0,0 +1,157 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import streamlit as st
+
+from firebase_config import get_firestore
+
+USERS = 'users'
+# Documents read per query when (re)loading a whole collection
+PAGE_SIZE = 500
+# Look for changed documents at most this often (seconds)
+REFRESH_INTERVAL = 30
+# Reload everything this often, which also drops deleted users (seconds)
+FULL_RELOAD_INTERVAL = 3600
+# Server timestamps of concurrent writes can become visible slightly out of order
+CHANGE_OVERLAP = timedelta(seconds=5)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def directory_entry(uid, user):
+    """The team directory view of a users/{uid} document."""
+    return {
+        'uid': uid,
+        'email': user.get('email'),
+        'display_name': user.get('display_name') or (user.get('email') or '').split('@')[0],
+        'last_sign_in': user.get('last_sign_in'),
+        'photo_url': user.get('profile_pic_url'),
+        'photo_renditions': user.get('profile_pic_renditions', {}),
+        'role': user.get('role', 'Member'),
+        'department': user.get('department', 'Not specified'),
+        'bio': user.get('bio', ''),
+        'company': user.get('company', ''),
+        'position': user.get('position', ''),
+        'address': user.get('address', {}),
+        'skills': user.get('skills', []),
+        'first_name': user.get('first_name', ''),
+        'last_name': user.get('last_name', ''),
+        'phone': user.get('phone', '')
+    }
+
+
+class CollectionSync:
+    """Reads a collection whole, in pages, then only documents changed since.
+
+    Writers stamp ``updated_at`` with SERVER_TIMESTAMP; documents written
+    before that stamp existed are only seen by full loads.
+    """
+
+    def __init__(self, db, collection, page_size=PAGE_SIZE):
+        self.db = db
+        self.collection = collection
+        self.page_size = page_size
+        self.since = None
+
+    def page(self, after=None):
+        """One server-side page of the collection in document id order, after a snapshot."""
+        query = self.db.collection(self.collection).order_by('__name__').limit(self.page_size)
+        if after is not None:
+            query = query.start_after(after)
+        return list(query.stream())
+
+    def load_all(self):
+        """Every document, a page at a time.
+
+        Later changes are looked for after the newest ``updated_at`` seen, or
+        after the load started when no document carries one yet.
+        """
+        started = datetime.now(timezone.utc)
+        self.since = None
+        snapshots, after = [], None
+        while True:
+            batch = self.page(after)
+            snapshots.extend(batch)
+            if len(batch) < self.page_size:
+                break
+            after = batch[-1]
+        self._seen(snapshots)
+        if self.since is None:
+            self.since = started
+        return snapshots
+
+    def changed(self):
+        """Documents stamped after the newest one already returned (with some overlap)."""
+        since = self.since - CHANGE_OVERLAP if self.since is not None else EPOCH
+        query = self.db.collection(self.collection).where('updated_at', '>', since)
+        return self._seen(list(query.stream()))
+
+    def _seen(self, snapshots):
+        for snapshot in snapshots:
+            updated_at = (snapshot.to_dict() or {}).get('updated_at')
+            if updated_at is not None and (self.since is None or updated_at > self.since):
+                self.since = updated_at
+        return snapshots
+
+
+class UserDirectory:
+    """uid-keyed index of user documents, kept current incrementally.
+
+    The first load (and an hourly reload) reads ``users`` in pages of
+    PAGE_SIZE; in between, at most every ``refresh_interval`` seconds, only
+    documents whose ``updated_at`` is newer than the latest one seen are read.
+    """
+
+    def __init__(self, db, refresh_interval=REFRESH_INTERVAL, full_reload_interval=FULL_RELOAD_INTERVAL):
+        self.db = db
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self._lock = threading.RLock()
+        self._sync = CollectionSync(db, USERS)
+        self._entries = {}
+        self._refreshed_at = None
+        self._loaded_at = None
+
+    def users(self):
+        """Every user, as directory entries."""
+        self.refresh()
+        with self._lock:
+            return list(self._entries.values())
+
+    def get_user(self, uid):
+        """One user's entry: an index lookup, or a single document read on a miss."""
+        self.refresh()
+        with self._lock:
+            entry = self._entries.get(uid)
+        if entry is None:
+            snapshot = self.db.collection(USERS).document(uid).get()
+            if not snapshot.exists:
+                return None
+            with self._lock:
+                self._apply([snapshot])
+                entry = self._entries.get(uid)
+        return dict(entry) if entry else None
+
+    def refresh(self, force=False):
+        """Pull changes if the index is older than refresh_interval (or always, with force)."""
+        now = time.monotonic()
+        with self._lock:
+            if self._loaded_at is None or now - self._loaded_at >= self.full_reload_interval:
+                self._entries = {}
+                self._apply(self._sync.load_all())
+                self._loaded_at = time.monotonic()
+            elif force or now - self._refreshed_at >= self.refresh_interval:
+                self._apply(self._sync.changed())
+            else:
+                return
+            self._refreshed_at = time.monotonic()
+
+    def _apply(self, snapshots):
+        for snapshot in snapshots:
+            self._entries[snapshot.id] = directory_entry(snapshot.id, snapshot.to_dict() or {})
+
+
+@st.cache_resource(show_spinner=False)
+def get_user_directory():
+    """Process-wide user directory shared by every session."""
+    return UserDirectory(get_firestore())
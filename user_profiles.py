@@ -0,0 +1,40 @@
+import time
+import streamlit as st
+from firebase_config import get_firestore
+
+# users/{uid}.role value that unlocks maintenance tools (set directly in Firestore)
+ADMIN_ROLE = 'admin'
+# Profiles rarely change; re-read at most this often per session (None = once per session)
+PROFILE_TTL = 300
+
+
+def get_user_profile(uid, ttl=PROFILE_TTL):
+    """Return the users/{uid} document as a dict, cached in the session."""
+    cache = st.session_state.setdefault("_profile_cache", {})
+    entry = cache.get(uid)
+    now = time.monotonic()
+    if entry is not None and (ttl is None or now - entry[0] < ttl):
+        return entry[1]
+
+    profile = get_firestore().collection('users').document(uid).get().to_dict() or {}
+    cache[uid] = (now, profile)
+    return profile
+
+
+def invalidate_user_profile(uid=None):
+    """Drop one cached profile after it is edited, or all of them when uid is None."""
+    cache = st.session_state.get("_profile_cache")
+    if not cache:
+        return
+    if uid is None:
+        cache.clear()
+    else:
+        cache.pop(uid, None)
+
+
+def is_admin():
+    """True when the signed-in user's profile has the admin role."""
+    current_user = st.session_state.get('current_user')
+    if not current_user:
+        return False
+    return get_user_profile(current_user['uid']).get('role') == ADMIN_ROLE